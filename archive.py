@@ -0,0 +1,191 @@
+import io
+import os
+import gzip
+import time
+import uuid
+import logging
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import zstandard
+except ImportError:  # 未安装 zstandard 时退回 gzip
+    zstandard = None
+
+ZSTD_SUFFIX = '.warc.zst'
+GZIP_SUFFIX = '.warc.gz'
+
+# 含会话凭据的头部不写入归档，避免 cookies 以明文保存在分段文件中
+SENSITIVE_HEADERS = ('set-cookie', 'set-cookie2', 'cookie', 'authorization', 'proxy-authorization')
+
+
+class ArchivedResponse(NamedTuple):
+    """归档中的一条原始响应"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    date: str
+
+
+def _build_record(response) -> bytes:
+    """将 requests 响应序列化为 WARC/1.1 response 记录"""
+    reason = getattr(response, 'reason', '') or ''
+    http_lines = [f"HTTP/1.1 {response.status_code} {reason}".rstrip()]
+    for name, value in response.headers.items():
+        # 正文已由 requests 解码，去掉与原始传输编码相关的头
+        if name.lower() in ('content-encoding', 'transfer-encoding', 'content-length'):
+            continue
+        if name.lower() in SENSITIVE_HEADERS:
+            continue
+        http_lines.append(f"{name}: {value}")
+    body = response.content or b''
+    http_lines.append(f"Content-Length: {len(body)}")
+    block = ('\r\n'.join(http_lines) + '\r\n\r\n').encode('utf-8') + body
+
+    warc_headers = [
+        'WARC/1.1',
+        'WARC-Type: response',
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}",
+        f"WARC-Target-URI: {response.url}",
+        'Content-Type: application/http; msgtype=response',
+        f"Content-Length: {len(block)}",
+    ]
+    return ('\r\n'.join(warc_headers) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+class ResponseArchive:
+    """只追加的压缩 WARC 归档
+
+    每条记录单独压缩（gzip member / zstd frame），写满 max_segment_bytes 后切换到新的分段文件，
+    已写入的分段不会再被修改。
+    """
+
+    def __init__(self, directory: str = 'archive', max_segment_bytes: int = 256 * 1024 * 1024,
+                 codec: Optional[str] = None, compression_level: int = 3):
+        if codec is None:
+            codec = 'zstd' if zstandard is not None else 'gzip'
+        if codec == 'zstd' and zstandard is None:
+            raise ValueError("使用 zstd 压缩需要先安装 zstandard: pip install zstandard")
+        if codec not in ('zstd', 'gzip'):
+            raise ValueError(f"不支持的压缩格式: {codec}")
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.codec = codec
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._segment_path = None
+        self._segment_index = 0
+        if codec == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+        os.makedirs(directory, exist_ok=True)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return self._compressor.compress(data)
+        return gzip.compress(data, compresslevel=min(max(self.compression_level, 1), 9))
+
+    def _new_segment_path(self) -> str:
+        self._segment_index += 1
+        suffix = ZSTD_SUFFIX if self.codec == 'zstd' else GZIP_SUFFIX
+        name = f"segment-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._segment_index:05d}{suffix}"
+        return os.path.join(self.directory, name)
+
+    def append(self, response):
+        """归档一条响应"""
+        data = self._compress(_build_record(response))
+        with self._lock:
+            if (self._segment_path is None
+                    or os.path.getsize(self._segment_path) + len(data) > self.max_segment_bytes):
+                self._segment_path = self._new_segment_path()
+            with open(self._segment_path, 'ab') as f:
+                f.write(data)
+
+
+def list_segments(directory: str) -> List[str]:
+    """按文件名顺序列出目录中的归档分段"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(ZSTD_SUFFIX) or name.endswith(GZIP_SUFFIX)
+    )
+
+
+def _open_segment(path: str):
+    """以解压流的方式打开分段文件"""
+    if path.endswith(ZSTD_SUFFIX):
+        if zstandard is None:
+            raise ValueError(f"读取 {path} 需要先安装 zstandard: pip install zstandard")
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.BufferedReader(reader)
+    return gzip.open(path, 'rb')
+
+
+def _read_headers(stream) -> Optional[Dict[str, str]]:
+    """读取一段以空行结束的头部，文件结束时返回None"""
+    headers = {}
+    first = True
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.rstrip(b'\r\n')
+        if first:
+            # 跳过记录之间的空行
+            if not line:
+                continue
+            headers[':first'] = line.decode('utf-8', errors='replace')
+            first = False
+            continue
+        if not line:
+            return headers
+        name, _, value = line.decode('utf-8', errors='replace').partition(':')
+        headers[name.strip()] = value.strip()
+
+
+def _parse_http_block(block: bytes):
+    """解析 HTTP 响应块为 (状态码, 头部, 正文)"""
+    head, _, body = block.partition(b'\r\n\r\n')
+    lines = head.decode('iso-8859-1').split('\r\n')
+    parts = lines[0].split(' ', 2)
+    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return status, headers, body
+
+
+def iter_segment(path: str, with_body: bool = True) -> Iterator[ArchivedResponse]:
+    """逐条读取分段文件中的响应记录，with_body=False 时只解析头部，正文为空"""
+    with _open_segment(path) as stream:
+        while True:
+            warc_headers = _read_headers(stream)
+            if warc_headers is None:
+                return
+            length = int(warc_headers.get('Content-Length', 0))
+            block = stream.read(length)
+            if len(block) < length:
+                logging.warning(f"归档分段 {path} 末尾记录不完整，已跳过")
+                return
+            if warc_headers.get('WARC-Type') != 'response':
+                continue
+            if not with_body:
+                head_end = block.find(b'\r\n\r\n')
+                if head_end >= 0:
+                    block = block[:head_end]
+            status, headers, body = _parse_http_block(block)
+            yield ArchivedResponse(
+                url=warc_headers.get('WARC-Target-URI', ''),
+                status=status,
+                headers=headers,
+                body=body,
+                date=warc_headers.get('WARC-Date', ''),
+            )
+
+
+def iter_archive(directory: str, with_body: bool = True) -> Iterator[ArchivedResponse]:
+    """按顺序读取目录中所有分段的响应记录"""
+    for path in list_segments(directory):
+        yield from iter_segment(path, with_body)
@@ -0,0 +1,67 @@
+import gc
+import random
+import itertools
+import argparse
+import tracemalloc
+from paper import Paper
+
+AUTHOR_POOL = [f"Author {i} Name" for i in range(500)]
+KEYWORD_POOL = [f"keyword {i}" for i in range(300)]
+# 按 Zipf 分布抽取词汇，使正文的压缩率接近真实英文文本
+_vocab_rng = random.Random(0)
+WORDS = [''.join(_vocab_rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(_vocab_rng.randint(2, 12)))
+         for _ in range(20000)]
+WORD_CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(WORDS))))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    """生成指定词数的模拟文本"""
+    return ' '.join(rng.choices(WORDS, cum_weights=WORD_CUM_WEIGHTS, k=words))
+
+
+def make_record(i: int, body_words: int) -> dict:
+    """生成一条模拟的论文字典（作者和关键词字符串每次重新构造，与解析结果一致）"""
+    rng = random.Random(i)
+    sections = []
+    for s in range(6):
+        text = _text(rng, body_words // 6)
+        sections.append({'title': f"{s + 1}. Section", 'text': text})
+    return {
+        'title': f"Paper title number {i}",
+        'authors': [(rng.choice(AUTHOR_POOL) + ' ')[:-1] for _ in range(6)],
+        'abstract': _text(rng, 200),
+        'keywords': [(rng.choice(KEYWORD_POOL) + ' ')[:-1] for _ in range(5)],
+        'full_text': '\n'.join(f"{s['title']} {s['text']}" for s in sections),
+        'sections': sections,
+        'doi': f"10.1016/j.test.{i}",
+        'accessed_time': '2024-02-07 10:00:00',
+        'url': f"https://www.sciencedirect.com/science/article/pii/S{i:016d}",
+    }
+
+
+def measure(label: str, build, count: int, body_words: int) -> float:
+    """测量 count 条记录常驻内存的平均占用（字节/篇）"""
+    gc.collect()
+    tracemalloc.start()
+    records = [build(make_record(i, body_words)) for i in range(count)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_paper = current / count
+    print(f"{label:<24} {per_paper / 1024:10.1f} KiB/篇")
+    del records
+    return per_paper
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="论文记录内存占用对比")
+    parser.add_argument('--count', type=int, default=2000, help="记录数量")
+    parser.add_argument('--body-words', type=int, default=6000, help="每篇正文词数")
+    args = parser.parse_args()
+
+    print(f"{args.count} 篇论文，每篇正文约 {args.body_words} 词")
+    baseline = measure('dict', lambda d: d, args.count, args.body_words)
+    compact = measure('Paper', Paper.from_dict, args.count, args.body_words)
+    compressed = measure('Paper(compress=True)',
+                         lambda d: Paper.from_dict(d, compress=True), args.count, args.body_words)
+    print(f"Paper 相对 dict: {compact / baseline:.1%}，压缩后: {compressed / baseline:.1%}")
@@ -0,0 +1,203 @@
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+import requests
+from paper import Paper, canonical_article_id
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class PaperCache:
+    """带过期时间的论文结果 LRU 缓存，保存紧凑的 Paper 记录"""
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Paper]:
+        """获取缓存的论文，过期则返回None"""
+        key = canonical_article_id(url)
+        with self._lock:
+            item = self._items.get(key)
+            if not item:
+                return None
+            stored_time, paper = item
+            if time.time() - stored_time > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return paper
+
+    def put(self, url: str, paper: Paper):
+        """写入缓存，超出容量时淘汰最久未使用的论文"""
+        key = canonical_article_id(url)
+        with self._lock:
+            self._items[key] = (time.time(), paper)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class AccessorDaemon:
+    """常驻进程：持有一个已登录的 ScienceDirectAccessor，通过本地 HTTP 提供论文获取服务"""
+
+    def __init__(self, accessor=None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 cache: Optional[PaperCache] = None):
+        if accessor is None:
+            from plugin import ScienceDirectAccessor
+            accessor = ScienceDirectAccessor()
+        self.accessor = accessor
+        self.cache = cache if cache is not None else PaperCache()
+        self.started_time = time.time()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+
+    @property
+    def address(self):
+        """返回实际监听的地址 (host, port)"""
+        return self.server.server_address[:2]
+
+    def warm_up(self) -> bool:
+        """预先验证 cookies，必要时登录，使后续请求无需再登录"""
+        if self.accessor._check_cookies_valid():
+            logging.info("守护进程预热完成，cookies 有效")
+            return True
+        logging.info("守护进程预热：cookies 无效，开始登录")
+        return self.accessor.login()
+
+    def get_paper_content(self, url: str, refresh: bool = False) -> Dict:
+        """获取论文内容，优先使用内存缓存（缓存中保存 Paper 记录，返回时才转换为字典）"""
+        paper = None if refresh else self.cache.get(url)
+        if paper is None:
+            # accessor 会合并同一论文的并发请求，并在线程间共享频率限制
+            paper = self.accessor.get_paper_record(url)
+            self.cache.put(url, paper)
+        return paper.to_dict()
+
+    def status(self) -> Dict:
+        """返回守护进程状态"""
+        return {
+            'status': 'ok',
+            'uptime': time.time() - self.started_time,
+            'cached_papers': len(self.cache),
+            'session_age': time.time() - self.accessor.session_start_time,
+        }
+
+    def _make_handler(self):
+        """创建绑定到当前守护进程的请求处理类"""
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send_json(self, status: int, payload: Dict):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self._send_json(200, daemon.status())
+                else:
+                    self._send_json(404, {'error': f"未知路径: {self.path}"})
+
+            def do_POST(self):
+                if self.path != '/paper':
+                    self._send_json(404, {'error': f"未知路径: {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                    url = request['url']
+                except (ValueError, KeyError, TypeError):
+                    self._send_json(400, {'error': "请求体必须是包含 url 字段的 JSON"})
+                    return
+                try:
+                    paper = daemon.get_paper_content(url, refresh=bool(request.get('refresh')))
+                    self._send_json(200, paper)
+                except ValueError as e:
+                    self._send_json(400, {'error': str(e)})
+                except Exception as e:
+                    self._send_json(500, {'error': str(e)})
+
+            def log_message(self, format, *args):
+                logging.info(f"守护进程请求: {format % args}")
+
+        return Handler
+
+    def serve_forever(self):
+        """开始处理请求，直到 shutdown() 被调用"""
+        host, port = self.address
+        logging.info(f"守护进程已启动，监听 http://{host}:{port}")
+        self.server.serve_forever()
+
+    def shutdown(self):
+        """停止服务并释放端口"""
+        self.server.shutdown()
+        self.server.server_close()
+        logging.info("守护进程已停止")
+
+
+class AccessorClient:
+    """守护进程的轻量客户端，接口与 ScienceDirectAccessor.get_paper_content 一致"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 120):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+        # 复用连接，避免每次调用重新建立 TCP 连接
+        self.session = requests.Session()
+        self.session.trust_env = False
+
+    def get_paper_content(self, url: str, refresh: bool = False) -> dict:
+        """通过守护进程获取论文内容"""
+        response = self.session.post(
+            f"{self.base_url}/paper",
+            json={'url': url, 'refresh': refresh},
+            timeout=self.timeout
+        )
+        payload = response.json()
+        if response.status_code == 400:
+            raise ValueError(payload.get('error', '请求无效'))
+        if response.status_code != 200:
+            raise Exception(payload.get('error', f"守护进程返回错误状态码 {response.status_code}"))
+        return payload
+
+    def health(self) -> dict:
+        """查询守护进程状态"""
+        response = self.session.get(f"{self.base_url}/health", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        """关闭客户端连接"""
+        self.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ScienceDirect 论文获取守护进程")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="监听地址（默认仅本机）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument('--no-warm-up', action='store_true', help="启动时不预先登录")
+    args = parser.parse_args()
+
+    daemon = AccessorDaemon(host=args.host, port=args.port)
+    if not args.no_warm_up and not daemon.warm_up():
+        logging.warning("预热登录失败，将在首次请求时重试")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.shutdown()
@@ -0,0 +1,97 @@
+import time
+from typing import Dict, List, Optional
+from paper import Paper
+
+# 论文字段提取函数，不依赖登录状态，可在离线重新提取的工作进程中直接使用
+
+REQUIRED_FIELDS = ['title', 'authors', 'abstract']
+
+
+def extract_title(soup) -> str:
+    """提取论文标题"""
+    title_elem = soup.find('span', class_='title-text')
+    return title_elem.text.strip() if title_elem else ''
+
+
+def extract_authors(soup) -> List[str]:
+    """提取作者信息"""
+    authors = []
+    author_elems = soup.find_all('a', class_='author')
+    for author in author_elems:
+        authors.append(author.text.strip())
+    return authors
+
+
+def extract_abstract(soup) -> str:
+    """提取摘要"""
+    abstract_elem = soup.find('div', class_='abstract')
+    return abstract_elem.text.strip() if abstract_elem else ''
+
+
+def extract_keywords(soup) -> List[str]:
+    """提取关键词"""
+    keywords = []
+    keyword_elems = soup.find_all('div', class_='keyword')
+    for keyword in keyword_elems:
+        keywords.append(keyword.text.strip())
+    return keywords
+
+
+def extract_full_text(soup) -> str:
+    """提取全文内容（与章节文本使用相同的空白规范化，章节文本是正文的子串）"""
+    content_elem = soup.find('div', id='body')
+    return content_elem.get_text(' ', strip=True) if content_elem else ''
+
+
+def extract_sections(soup) -> List[Dict]:
+    """按章节提取全文内容"""
+    content_elem = soup.find('div', id='body')
+    if not content_elem:
+        return []
+
+    sections = []
+    for section in content_elem.find_all('section'):
+        # 只处理顶层章节，子章节的内容包含在父章节中
+        if section.find_parent('section'):
+            continue
+        heading = section.find(['h2', 'h3', 'h4'])
+        title = heading.text.strip() if heading else ''
+        text = section.get_text(' ', strip=True)
+        if title and text.startswith(title):
+            text = text[len(title):].strip()
+        if text:
+            sections.append({'title': title, 'text': text})
+
+    # 没有章节结构时，整个正文作为一个章节
+    if not sections:
+        text = content_elem.get_text(' ', strip=True)
+        if text:
+            sections.append({'title': '', 'text': text})
+    return sections
+
+
+def extract_doi(soup) -> str:
+    """提取DOI"""
+    doi_elem = soup.find('a', class_='doi')
+    return doi_elem.text.strip() if doi_elem else ''
+
+
+def build_paper(soup, url: str, accessed_time: Optional[str] = None, compress: bool = False) -> Paper:
+    """从解析树中提取论文记录"""
+    return Paper(
+        title=extract_title(soup),
+        authors=extract_authors(soup),
+        abstract=extract_abstract(soup),
+        keywords=extract_keywords(soup),
+        full_text=extract_full_text(soup),
+        sections=extract_sections(soup),
+        doi=extract_doi(soup),
+        accessed_time=accessed_time or time.strftime('%Y-%m-%d %H:%M:%S'),
+        url=url,
+        compress=compress
+    )
+
+
+def validate_paper_content(paper_info) -> bool:
+    """验证提取的论文内容是否有效"""
+    return all(paper_info.get(field) for field in REQUIRED_FIELDS)
@@ -0,0 +1,115 @@
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+from paper import Paper, FIELDS, canonical_article_id
+
+ARTICLE_BASE_URL = 'https://www.sciencedirect.com/science/article/pii/'
+
+# 搜索结果页与期刊目录页中单篇文章的容器
+ITEM_SELECTORS = ('li.ResultItem', 'li.js-article-list-item', 'li.article-item')
+TITLE_LINK_SELECTORS = ('a.result-list-title-link', 'a.article-content-title', "a[href*='/science/article/pii/']")
+AUTHOR_SELECTORS = ('ol.Authors .author', 'ul.Authors .author', '.js-article__item__authors')
+# 列表页只显示摘要片段，单独保存在 abstract_snippet 中，不能当作完整摘要
+SNIPPET_SELECTORS = ('.js-abstract-body-text', '.preview-abstract', '.abstract-text', 'div.abstract')
+DOI_SELECTORS = ('.js-article-item-doi', "a[href*='doi.org/']")
+NEXT_PAGE_SELECTORS = ('li.next-link a', "a[data-aa-name='srp-next-page']", "a[rel='next']")
+
+
+def _select_first(elem, selectors):
+    """返回第一个匹配的元素"""
+    for selector in selectors:
+        found = elem.select_one(selector)
+        if found is not None:
+            return found
+    return None
+
+
+def _extract_item_authors(item) -> List[str]:
+    """提取列表项中的作者"""
+    for selector in AUTHOR_SELECTORS:
+        elems = item.select(selector)
+        if not elems:
+            continue
+        if len(elems) == 1 and ',' in elems[0].text:
+            # 期刊目录页的作者在同一个元素中以逗号分隔
+            return [name.strip() for name in elems[0].text.split(',') if name.strip()]
+        return [elem.text.strip() for elem in elems if elem.text.strip()]
+    return []
+
+
+def _extract_item_doi(item) -> str:
+    """提取列表项中的DOI"""
+    doi = item.get('data-doi', '')
+    if doi:
+        return doi.strip()
+    elem = _select_first(item, DOI_SELECTORS)
+    if elem is None:
+        return ''
+    text = elem.get('href', '') if elem.name == 'a' else elem.text
+    return text.split('doi.org/')[-1].replace('DOI:', '').strip()
+
+
+def extract_listing(soup, base_url: str = 'https://www.sciencedirect.com') -> List[Dict]:
+    """从搜索结果页或期刊目录页中提取文章的部分元数据
+
+    返回的字典包含与 get_paper_content 相同的字段，但只填充了列表页上可见的字段
+    （通常是标题、作者、DOI、URL），其余字段为空。列表页上的摘要片段保存在额外的
+    abstract_snippet 字段中，abstract 保持为空，需要完整摘要时仍会抓取文章页。
+    """
+    items = []
+    for selector in ITEM_SELECTORS:
+        items = soup.select(selector)
+        if items:
+            break
+    if not items:
+        # 未知页面结构：退化为按文章链接所在的列表项提取
+        items = [link.find_parent('li') or link for link in soup.select(TITLE_LINK_SELECTORS[-1])]
+
+    papers = []
+    seen = set()
+    accessed_time = time.strftime('%Y-%m-%d %H:%M:%S')
+    for item in items:
+        link = _select_first(item, TITLE_LINK_SELECTORS) if item.name != 'a' else item
+        if link is None or '/pii/' not in link.get('href', ''):
+            continue
+        article_id = canonical_article_id(urljoin(base_url, link['href']))
+        if article_id in seen:
+            continue
+        seen.add(article_id)
+
+        paper = Paper(
+            title=link.get_text(' ', strip=True),
+            authors=_extract_item_authors(item),
+            doi=_extract_item_doi(item),
+            accessed_time=accessed_time,
+            url=ARTICLE_BASE_URL + article_id,
+        ).to_dict()
+        snippet_elem = _select_first(item, SNIPPET_SELECTORS)
+        paper['abstract_snippet'] = snippet_elem.get_text(' ', strip=True) if snippet_elem else ''
+        papers.append(paper)
+    return papers
+
+
+def find_next_page(soup, current_url: str) -> Optional[str]:
+    """查找下一页链接"""
+    link = _select_first(soup, NEXT_PAGE_SELECTORS)
+    if link is None or not link.get('href'):
+        return None
+    return urljoin(current_url, link['href'])
+
+
+def missing_fields(paper, required_fields: Iterable[str]) -> List[str]:
+    """返回记录中缺失的字段"""
+    return [field for field in required_fields if not paper.get(field)]
+
+
+def merge_paper(partial, full) -> Dict:
+    """用完整文章页的记录补全列表页记录，完整记录中为空的字段保留列表页的值
+
+    只合并论文字段，摘要片段不会写入 abstract。
+    """
+    merged = dict(full)
+    for field in FIELDS:
+        if not merged.get(field) and partial.get(field):
+            merged[field] = partial[field]
+    return merged
@@ -0,0 +1,146 @@
+import re
+import sys
+import json
+import zlib
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+# 字段顺序与 get_paper_content 返回的字典保持一致
+FIELDS = ('title', 'authors', 'abstract', 'keywords', 'full_text', 'sections',
+          'doi', 'accessed_time', 'url')
+
+# 小于该长度的正文压缩收益不大，保持原样
+COMPRESS_MIN_SIZE = 1024
+
+_PII_PATTERN = re.compile(r'/pii/([A-Z0-9]+)', re.IGNORECASE)
+
+
+def canonical_article_id(url: str) -> str:
+    """从论文URL中提取规范化的文章ID（优先使用PII）"""
+    match = _PII_PATTERN.search(url or '')
+    if match:
+        return match.group(1).upper()
+    return (url or '').split('?')[0].split('#')[0].rstrip('/')
+
+
+def _intern_all(values) -> tuple:
+    """驻留字符串，多篇论文中重复出现的作者和关键词只保留一份"""
+    return tuple(sys.intern(v) for v in values or ())
+
+
+class Paper(Mapping):
+    """紧凑的论文记录
+
+    使用 __slots__ 避免每条记录携带字典，作者与关键词为驻留字符串元组，
+    章节以正文中的偏移表示（正文只保存一份），可选择以 zlib 压缩保存（读取时透明解压）。
+    同时实现 Mapping 接口，原有按字典访问的调用方式（paper['title']、
+    paper.get('doi')、dict(paper)）保持不变。
+    """
+
+    __slots__ = ('title', 'authors', 'abstract', 'keywords', '_body', '_compressed',
+                 'doi', 'accessed_time', 'url')
+
+    def __init__(self, title: str = '', authors: Optional[List[str]] = None, abstract: str = '',
+                 keywords: Optional[List[str]] = None, full_text: str = '',
+                 sections: Optional[List[Dict]] = None, doi: str = '',
+                 accessed_time: str = '', url: str = '', compress: bool = False):
+        self.title = title
+        self.authors = _intern_all(authors)
+        self.abstract = abstract
+        self.keywords = _intern_all(keywords)
+        self.doi = doi
+        self.accessed_time = accessed_time
+        self.url = url
+        self._set_body(full_text, sections or [], compress)
+
+    def _set_body(self, full_text: str, sections: List[Dict], compress: bool):
+        """保存正文与章节，按需压缩
+
+        章节文本是正文的子串时只记录 (标题, 起始, 结束) 偏移，正文只保存一份；
+        找不到的章节才单独保存 (标题, 文本)。
+        """
+        spans = []
+        cursor = 0
+        for section in sections:
+            title, text = section.get('title', ''), section.get('text', '')
+            start = full_text.find(text, cursor) if text else -1
+            if start < 0 and text:
+                start = full_text.find(text)
+            if start < 0:
+                spans.append((title, text))
+            else:
+                cursor = start + len(text)
+                spans.append((title, start, cursor))
+        spans = tuple(spans)
+        if compress and len(full_text) >= COMPRESS_MIN_SIZE:
+            payload = json.dumps([full_text, spans], ensure_ascii=False).encode('utf-8')
+            self._body = zlib.compress(payload)
+            self._compressed = True
+        else:
+            self._body = (full_text, spans)
+            self._compressed = False
+
+    def _get_body(self):
+        """读取正文与章节偏移（压缩时解压）"""
+        if self._compressed:
+            full_text, spans = json.loads(zlib.decompress(self._body).decode('utf-8'))
+            return full_text, spans
+        return self._body
+
+    @property
+    def full_text(self) -> str:
+        return self._get_body()[0]
+
+    @property
+    def sections(self) -> List[Dict]:
+        full_text, spans = self._get_body()
+        return [{'title': span[0], 'text': full_text[span[1]:span[2]] if len(span) == 3 else span[1]}
+                for span in spans]
+
+    @property
+    def compressed(self) -> bool:
+        return self._compressed
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        # 对外保持与原字典相同的 list 类型
+        return list(value) if key in ('authors', 'keywords') else value
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        if key == 'full_text':
+            self._set_body(value, self.sections, self._compressed)
+        elif key == 'sections':
+            self._set_body(self.full_text, value, self._compressed)
+        elif key in ('authors', 'keywords'):
+            setattr(self, key, _intern_all(value))
+        else:
+            setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"Paper(title={self.title!r}, url={self.url!r})"
+
+    def copy(self) -> 'Paper':
+        """返回浅拷贝"""
+        paper = Paper.__new__(Paper)
+        for name in self.__slots__:
+            setattr(paper, name, getattr(self, name))
+        return paper
+
+    def to_dict(self) -> Dict:
+        """转换为普通字典（可直接 JSON 序列化）"""
+        return {key: self[key] for key in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict, compress: bool = False) -> 'Paper':
+        """从字典构造记录，忽略未知字段"""
+        return cls(compress=compress, **{key: data[key] for key in FIELDS if key in data})
@@ -0,0 +1,190 @@
+import re
+import json
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+from paper import canonical_article_id
+
+# 可检索字段及其 BM25 权重（标题、关键词命中比正文命中更重要）
+FIELD_WEIGHTS = {
+    'title': 10.0,
+    'authors': 5.0,
+    'abstract': 4.0,
+    'keywords': 6.0,
+    'body': 1.0,
+}
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class PaperIndex:
+    """基于 SQLite FTS5 的论文全文索引"""
+
+    def __init__(self, db_path: str = 'paper_index.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        """创建索引表结构"""
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    id INTEGER PRIMARY KEY,
+                    article_id TEXT UNIQUE NOT NULL,
+                    url TEXT,
+                    doi TEXT,
+                    title TEXT,
+                    accessed_time TEXT,
+                    record TEXT
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    {', '.join(FIELD_WEIGHTS)},
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+
+    def _upsert(self, paper: Dict):
+        """写入或原地更新一篇论文（调用方负责事务）"""
+        article_id = canonical_article_id(paper.get('url', ''))
+        if not article_id:
+            raise ValueError("论文记录缺少URL，无法建立索引")
+
+        sections = paper.get('sections') or []
+        if sections:
+            body = '\n'.join(f"{s.get('title', '')}\n{s.get('text', '')}" for s in sections)
+        else:
+            body = paper.get('full_text', '')
+
+        row = self.conn.execute(
+            "SELECT id FROM papers WHERE article_id = ?", (article_id,)
+        ).fetchone()
+        record = json.dumps(
+            {k: paper[k] for k in paper if k not in ('full_text', 'sections')},
+            ensure_ascii=False
+        )
+        values = (paper.get('url', ''), paper.get('doi', ''), paper.get('title', ''),
+                  paper.get('accessed_time', ''), record)
+
+        if row:
+            paper_id = row['id']
+            self.conn.execute(
+                "UPDATE papers SET url = ?, doi = ?, title = ?, accessed_time = ?, record = ? WHERE id = ?",
+                values + (paper_id,)
+            )
+            self.conn.execute("DELETE FROM papers_fts WHERE rowid = ?", (paper_id,))
+        else:
+            paper_id = self.conn.execute(
+                "INSERT INTO papers (article_id, url, doi, title, accessed_time, record) VALUES (?, ?, ?, ?, ?, ?)",
+                (article_id,) + values
+            ).lastrowid
+
+        self.conn.execute(
+            "INSERT INTO papers_fts (rowid, title, authors, abstract, keywords, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                paper_id,
+                paper.get('title', ''),
+                '; '.join(paper.get('authors') or []),
+                paper.get('abstract', ''),
+                '; '.join(paper.get('keywords') or []),
+                body,
+            )
+        )
+
+    def add_paper(self, paper: Dict):
+        """增量添加一篇论文，重复抓取的论文会原地更新"""
+        with self._lock, self.conn:
+            self._upsert(paper)
+        logging.info(f"论文已加入索引：{paper.get('title', '')}")
+
+    def add_papers(self, papers: Iterable[Dict]) -> int:
+        """在一个事务中批量添加论文，返回写入数量"""
+        count = 0
+        with self._lock, self.conn:
+            for paper in papers:
+                self._upsert(paper)
+                count += 1
+        logging.info(f"批量索引完成，共 {count} 篇论文")
+        return count
+
+    def remove_paper(self, url: str) -> bool:
+        """从索引中删除论文"""
+        article_id = canonical_article_id(url)
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT id FROM papers WHERE article_id = ?", (article_id,)
+            ).fetchone()
+            if not row:
+                return False
+            self.conn.execute("DELETE FROM papers_fts WHERE rowid = ?", (row['id'],))
+            self.conn.execute("DELETE FROM papers WHERE id = ?", (row['id'],))
+        return True
+
+    @staticmethod
+    def _build_match_query(query: str, fields: Optional[List[str]] = None) -> str:
+        """将普通关键词转换为 FTS5 查询表达式"""
+        tokens = _TOKEN_PATTERN.findall(query)
+        if not tokens:
+            raise ValueError("查询中没有可检索的关键词")
+        match = ' '.join(f'"{token}"' for token in tokens)
+        if fields:
+            unknown = set(fields) - set(FIELD_WEIGHTS)
+            if unknown:
+                raise ValueError(f"未知的检索字段: {', '.join(sorted(unknown))}")
+            match = f"{{{' '.join(fields)}}} : ({match})"
+        return match
+
+    def search(self, query: str, fields: Optional[List[str]] = None,
+               limit: int = 10, raw: bool = False) -> List[Dict]:
+        """按相关度检索论文
+
+        query 默认按关键词处理（所有关键词都需命中）；raw=True 时直接作为
+        FTS5 查询语法使用，例如 'title:graphene AND abstract:battery'。
+        fields 可限定检索字段，可选值见 FIELD_WEIGHTS。
+        """
+        match = query if raw else self._build_match_query(query, fields)
+        weights = ', '.join(str(w) for w in FIELD_WEIGHTS.values())
+        with self._lock:
+            rows = self.conn.execute(f"""
+                SELECT p.url, p.doi, p.title, p.accessed_time, p.record,
+                       bm25(papers_fts, {weights}) AS score,
+                       snippet(papers_fts, -1, '[', ']', '...', 16) AS snippet
+                FROM papers_fts
+                JOIN papers p ON p.id = papers_fts.rowid
+                WHERE papers_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            """, (match, limit)).fetchall()
+
+        results = []
+        for row in rows:
+            result = json.loads(row['record'])
+            # bm25 分数越小越相关，取反后越大越相关
+            result['score'] = -row['score']
+            result['snippet'] = row['snippet']
+            results.append(result)
+        return results
+
+    def get_paper(self, url: str) -> Optional[Dict]:
+        """按URL获取已索引论文的元数据"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT record FROM papers WHERE article_id = ?", (canonical_article_id(url),)
+            ).fetchone()
+        return json.loads(row['record']) if row else None
+
+    def count(self) -> int:
+        """返回索引中的论文数量"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
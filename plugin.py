@@ -13,8 +13,17 @@ from fake_useragent import UserAgent
 from urllib.parse import urlparse
 import logging
 import random
+import threading
+from contextlib import contextmanager
 from decorators import retry_with_backoff
 from proxy_manager import ProxyManager
+from paper import Paper, canonical_article_id
+import extractors
+from archive import ResponseArchive
+import listing
+from singleflight import SingleFlight
+from profiling import Profiler, profiled
+from session_state import classify_session, log_decision
 from selenium.webdriver.common.keys import Keys
 
 class ScienceDirectAccessor:
@@ -31,7 +40,23 @@ class ScienceDirectAccessor:
         self.min_request_interval = 5  # 最小请求间隔（秒）
         self.session_start_time = time.time()
         self.max_session_duration = 3600  # 最大会话时长（1小时）
+        self.cookies_valid_until = 0
+        self.cookie_check_interval = 300  # cookies 验证结果缓存时间（秒）
+        self.last_login_time = 0
+        self.login_reuse_window = 30  # 刚完成的登录在此时间内直接复用（秒）
+        self.last_session_decision = None
+        self.compress_full_text = os.getenv('SD_COMPRESS_FULL_TEXT', '').lower() in ('1', 'true', 'yes')
         self.proxy_manager = ProxyManager()
+        # 并发协调：相同论文的抓取和登录操作同一时刻只执行一次
+        self._fetch_flight = SingleFlight()
+        self._login_flight = SingleFlight()
+        self._rate_limit_lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        # 原始响应归档（设置 SD_ARCHIVE_DIR 后开启，用于离线重新提取）
+        archive_dir = os.getenv('SD_ARCHIVE_DIR')
+        self.archive = ResponseArchive(archive_dir) if archive_dir else None
+        # 性能采样（默认关闭，可通过 SD_PROFILE 环境变量或 profiling() 开启）
+        self.profiler = Profiler.from_env()
         
     def _load_credentials(self):
         """安全地加载凭据"""
@@ -209,8 +234,27 @@ class ScienceDirectAccessor:
             logging.error(f"处理人机验证时出错: {str(e)}")
             return False
 
+    @contextmanager
+    def profiling(self, sample_rate: float = 1.0, output_dir: str = None):
+        """在上下文内开启性能采样，退出后恢复原有设置"""
+        previous = self.profiler
+        self.profiler = Profiler(sample_rate=sample_rate, output_dir=output_dir or previous.output_dir)
+        try:
+            yield self.profiler
+        finally:
+            self.profiler = previous
+            
+    @profiled()
     def login(self):
-        """登录到 ScienceDirect"""
+        """登录到 ScienceDirect（并发调用只会启动一次登录流程）"""
+        if time.time() - self.last_login_time < self.login_reuse_window:
+            logging.info("刚刚完成登录，复用当前会话")
+            return True
+        success, _ = self._login_flight.do('login', self._login)
+        return success
+        
+    def _login(self):
+        """执行登录流程"""
         max_retries = 3
         retry_count = 0
         
@@ -302,6 +346,9 @@ class ScienceDirectAccessor:
                             # 保存 cookies
                             self.cookies = self.driver.get_cookies()
                             self._save_cookies()
+                            self._load_cookies_to_session()
+                            self.cookies_valid_until = time.time() + self.cookie_check_interval
+                            self.last_login_time = time.time()
                             logging.info("登录成功，保存 cookies")
                             return True
                         else:
@@ -388,23 +435,29 @@ class ScienceDirectAccessor:
         
     def _enforce_rate_limit(self):
         """强制执行请求频率限制"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
+        # 在锁内预约下一个请求时间，锁外等待，多线程下同样遵守频率限制
+        with self._rate_limit_lock:
+            current_time = time.time()
+            scheduled_time = max(current_time, self.last_request_time + self.min_request_interval)
+            self.last_request_time = scheduled_time
+        sleep_time = scheduled_time - current_time
+        if sleep_time > 0:
             logging.info(f"等待 {sleep_time:.2f} 秒以遵守访问频率限制")
             time.sleep(sleep_time)
-        self.last_request_time = current_time
         
     def _check_session_validity(self):
         """检查会话是否有效"""
-        if time.time() - self.session_start_time > self.max_session_duration:
-            logging.info("会话已过期，需要重新登录")
-            self.cookies = None
-            self.session_start_time = time.time()
-            return False
+        with self._session_lock:
+            if time.time() - self.session_start_time > self.max_session_duration:
+                logging.info("会话已过期，需要重新登录")
+                self.cookies = None
+                self.cookies_valid_until = 0
+                self.last_login_time = 0
+                self.session_start_time = time.time()
+                return False
         return True
         
+    @profiled()
     def _secure_request(self, url, method='get', **kwargs):
         """安全的请求包装器"""
         self._enforce_rate_limit()
@@ -433,13 +486,37 @@ class ScienceDirectAccessor:
         
         try:
             response = getattr(self.session, method)(url, **kwargs)
+            self._archive_response(response)
             response.raise_for_status()
             return response
         except requests.exceptions.RequestException as e:
             logging.error(f"请求失败: {str(e)}")
             raise
             
+    def _archive_response(self, response):
+        """将原始响应写入归档（归档失败不影响请求本身）"""
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(response)
+        except Exception as e:
+            logging.error(f"归档响应失败: {str(e)}")
+            
     def get_paper_content(self, url: str) -> dict:
+        """获取论文内容，返回普通字典（同一论文的并发请求只抓取一次）"""
+        return dict(self.get_paper_record(url))
+        
+    # 在最外层的抓取入口采样，get_paper_content 与 get_paper_record 的每次抓取只采集一次
+    @profiled(name='get_paper_content')
+    def get_paper_record(self, url: str) -> Paper:
+        """获取论文内容，返回紧凑的 Paper 记录，适合在内存中保存大量论文的调用方"""
+        paper_info, shared = self._fetch_flight.do(
+            canonical_article_id(url), self._get_paper_content, url
+        )
+        # 共享结果时返回副本，避免调用方之间互相修改
+        return paper_info.copy() if shared else paper_info
+        
+    def _get_paper_content(self, url: str) -> Paper:
         """获取论文内容（带重试机制）"""
         try:
             # 验证URL是否为ScienceDirect
@@ -452,31 +529,14 @@ class ScienceDirectAccessor:
                 if not self.login():
                     raise Exception("登录失败")
             
-            # 使用安全的请求方法访问论文页面
-            response = self._secure_request(url)
+            # 访问论文页面，需要时重新登录
+            soup = self._fetch_authorized_page(url)
             
-            # 解析页面内容
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 检查是否需要重新登录
-            if self._needs_relogin(soup):
-                logging.info("检测到需要重新登录")
-                if not self.login():
-                    raise Exception("重新登录失败")
-                response = self._secure_request(url)
-                soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 提取论文信息
-            paper_info = {
-                'title': self._extract_title(soup),
-                'authors': self._extract_authors(soup),
-                'abstract': self._extract_abstract(soup),
-                'keywords': self._extract_keywords(soup),
-                'full_text': self._extract_full_text(soup),
-                'doi': self._extract_doi(soup),
-                'accessed_time': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'url': url
-            }
+            # 提取论文信息后立即释放解析树
+            try:
+                paper_info = self._build_paper(soup, url)
+            finally:
+                soup.decompose()
             
             # 验证提取的内容
             if not self._validate_paper_content(paper_info):
@@ -489,6 +549,100 @@ class ScienceDirectAccessor:
             logging.error(f"获取论文内容失败：{str(e)}")
             raise
             
+    def iter_listing(self, url: str, max_pages: int = 10):
+        """逐页读取搜索结果或期刊目录页，生成只含列表页元数据的论文字典"""
+        if not self._validate_url(url):
+            raise ValueError("无效的ScienceDirect URL")
+        
+        seen = set()
+        visited = set()
+        page = 0
+        while url and page < max_pages and url not in visited:
+            visited.add(url)
+            page += 1
+            soup = self._fetch_authorized_page(url)
+            try:
+                papers = listing.extract_listing(soup, url)
+                next_url = listing.find_next_page(soup, url)
+            finally:
+                soup.decompose()
+            
+            logging.info(f"列表页第 {page} 页提取到 {len(papers)} 篇文章：{url}")
+            for paper in papers:
+                article_id = canonical_article_id(paper['url'])
+                if article_id not in seen:
+                    seen.add(article_id)
+                    yield paper
+            if not papers:
+                break
+            url = next_url
+            
+    def harvest_metadata(self, url: str, required_fields=('title', 'authors', 'doi'),
+                         max_pages: int = 10):
+        """批量获取元数据：先使用列表页信息，只对缺少 required_fields 的文章抓取文章页
+
+        默认只要求列表页本身提供的字段。列表页只有摘要片段，required_fields 包含
+        abstract 时每篇文章都要额外请求一次文章页。
+        """
+        listed = 0
+        fetched = 0
+        for partial in self.iter_listing(url, max_pages):
+            listed += 1
+            missing = listing.missing_fields(partial, required_fields)
+            if not missing:
+                yield partial
+                continue
+            
+            fetched += 1
+            logging.info(f"列表页缺少字段 {', '.join(missing)}，抓取文章页：{partial['url']}")
+            try:
+                full = self.get_paper_content(partial['url'])
+            except Exception as e:
+                logging.error(f"抓取文章页失败，保留列表页信息：{str(e)}")
+                yield partial
+                continue
+            yield listing.merge_paper(partial, full)
+        logging.info(f"批量元数据获取完成：列表页文章 {listed} 篇，额外抓取文章页 {fetched} 次")
+            
+    def _fetch_authorized_page(self, url):
+        """请求并解析页面，检测到会话失效时重新登录并重试一次
+
+        重新登录后页面仍像未登录（例如无权访问全文的论文只显示摘要）时照常返回，
+        由后续的提取和内容验证决定能否使用。
+        """
+        soup, needs_login = self._fetch_page(url)
+        if needs_login:
+            logging.info("检测到需要重新登录")
+            if soup is not None:
+                soup.decompose()
+            if not self.login():
+                raise Exception("重新登录失败")
+            soup, needs_login = self._fetch_page(url)
+            if soup is None:
+                raise Exception("重新登录后仍无法访问页面")
+            if needs_login:
+                logging.warning(f"重新登录后页面仍显示未登录，继续提取可见内容：{url}")
+        return soup
+        
+    def _fetch_page(self, url):
+        """请求并解析论文页面，返回 (解析树, 是否需要重新登录)"""
+        try:
+            response = self._secure_request(url)
+        except requests.exceptions.HTTPError as e:
+            # 401/403 说明会话失效，交由调用方重新登录；其他错误照常抛出
+            if e.response is None or e.response.status_code not in (401, 403):
+                raise
+            decision = classify_session(response=e.response)
+            log_decision(decision, url)
+            return None, decision.needs_login
+        
+        soup = BeautifulSoup(response.text, 'html.parser')
+        return soup, self._needs_relogin(soup, response)
+        
+    def _build_paper(self, soup, url) -> Paper:
+        """从解析树中提取论文记录"""
+        return extractors.build_paper(soup, url, compress=self.compress_full_text)
+            
     def _validate_url(self, url):
         """验证URL是否为有效的ScienceDirect链接"""
         try:
@@ -499,16 +653,28 @@ class ScienceDirectAccessor:
             
     def _check_cookies_valid(self):
         """检查cookies是否有效"""
+        # 最近验证过的 cookies 直接视为有效，避免每次请求都访问首页
+        if self.cookies and time.time() < self.cookies_valid_until:
+            return True
+        
         if not self._load_cookies():
             return False
+        self._load_cookies_to_session()
         
-        # 尝试访问ScienceDirect首页验证cookies
+        # 尝试访问ScienceDirect首页验证cookies（首页页头总有 "Sign in" 链接，按页面结构判断）
         headers = {'User-Agent': self.ua.random}
         try:
             response = self.session.get('https://www.sciencedirect.com', headers=headers)
-            return 'Sign in' not in response.text
+            soup = BeautifulSoup(response.text, 'html.parser')
+            try:
+                valid = not self._needs_relogin(soup, response)
+            finally:
+                soup.decompose()
         except:
             return False
+        if valid:
+            self.cookies_valid_until = time.time() + self.cookie_check_interval
+        return valid
             
     def _load_cookies_to_session(self):
         """将cookies加载到requests session中"""
@@ -518,39 +684,31 @@ class ScienceDirectAccessor:
                 
     def _extract_title(self, soup):
         """提取论文标题"""
-        title_elem = soup.find('span', class_='title-text')
-        return title_elem.text.strip() if title_elem else ''
+        return extractors.extract_title(soup)
         
     def _extract_authors(self, soup):
         """提取作者信息"""
-        authors = []
-        author_elems = soup.find_all('a', class_='author')
-        for author in author_elems:
-            authors.append(author.text.strip())
-        return authors
+        return extractors.extract_authors(soup)
         
     def _extract_abstract(self, soup):
         """提取摘要"""
-        abstract_elem = soup.find('div', class_='abstract')
-        return abstract_elem.text.strip() if abstract_elem else ''
+        return extractors.extract_abstract(soup)
         
     def _extract_keywords(self, soup):
         """提取关键词"""
-        keywords = []
-        keyword_elems = soup.find_all('div', class_='keyword')
-        for keyword in keyword_elems:
-            keywords.append(keyword.text.strip())
-        return keywords
+        return extractors.extract_keywords(soup)
         
     def _extract_full_text(self, soup):
         """提取全文内容"""
-        content_elem = soup.find('div', id='body')
-        return content_elem.text.strip() if content_elem else ''
+        return extractors.extract_full_text(soup)
+        
+    def _extract_sections(self, soup):
+        """按章节提取全文内容"""
+        return extractors.extract_sections(soup)
         
     def _extract_doi(self, soup):
         """提取DOI"""
-        doi_elem = soup.find('a', class_='doi')
-        return doi_elem.text.strip() if doi_elem else ''
+        return extractors.extract_doi(soup)
 
     def test_direct_access(self):
         """测试直接访问论文"""
@@ -579,24 +737,20 @@ class ScienceDirectAccessor:
             print(f"直接访问失败: {str(e)}")
             return None
 
-    def _needs_relogin(self, soup):
-        """检查是否需要重新登录"""
-        # 检查是否存在登录按钮或其他登录指示器
-        login_indicators = [
-            'Sign in',
-            'Please sign in',
-            'Access denied',
-            'Please log in',
-            '请登录',
-            '访问受限'
-        ]
-        page_text = soup.get_text().lower()
-        return any(indicator.lower() in page_text for indicator in login_indicators)
+    def _needs_relogin(self, soup, response=None):
+        """检查是否需要重新登录
+
+        依据状态码、重定向地址和页面结构（全文容器、用户头像）判断，
+        页头中的 "Sign in" 链接不会再触发重新登录。
+        """
+        decision = classify_session(soup, response)
+        self.last_session_decision = decision
+        log_decision(decision, getattr(response, 'url', None))
+        return decision.needs_login
         
     def _validate_paper_content(self, paper_info):
         """验证提取的论文内容是否有效"""
-        required_fields = ['title', 'authors', 'abstract']
-        return all(paper_info.get(field) for field in required_fields)
+        return extractors.validate_paper_content(paper_info)
 
 if __name__ == "__main__":
     accessor = ScienceDirectAccessor()
@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+import random
+import pstats
+import cProfile
+import logging
+import functools
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Callable, Any, Optional
+
+# 进程内同一时刻只采集一次：cProfile 与 tracemalloc 都是全局状态，并发采集会互相干扰
+_capture_lock = threading.Lock()
+_local = threading.local()
+
+
+class StackSampler:
+    """后台线程定时采样目标线程的调用栈，汇总为 flamegraph 可用的折叠栈"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label.replace(';', ':').replace(' ', '_')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str):
+        """写出折叠栈文件（每行：栈;帧 采样数）"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """按采样率对关键调用进行 cProfile、调用栈和 tracemalloc 采集
+
+    每次被采样的调用在 output_dir 下生成：
+        <名称>-<时间>-<进程号>-<序号>.prof       cProfile 统计（pstats 格式）
+        <名称>-<时间>-<进程号>-<序号>.collapsed  折叠栈（可直接输入 flamegraph.pl）
+        <名称>-<时间>-<进程号>-<序号>.alloc.txt  内存分配最多的代码行
+    """
+
+    def __init__(self, sample_rate: float = 0.0, output_dir: str = 'profiles',
+                 stack_interval: float = 0.005, top_allocations: int = 25):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.stack_interval = stack_interval
+        self.top_allocations = top_allocations
+        self._counter = 0
+
+    @classmethod
+    def from_env(cls) -> 'Profiler':
+        """根据环境变量创建
+
+        SD_PROFILE=1 开启采集；SD_PROFILE_SAMPLE_RATE 为采样率（默认 0.05）；
+        SD_PROFILE_DIR 为输出目录（默认 profiles）。
+        """
+        enabled = os.getenv('SD_PROFILE', '').lower() in ('1', 'true', 'yes')
+        try:
+            sample_rate = float(os.getenv('SD_PROFILE_SAMPLE_RATE', '0.05')) if enabled else 0.0
+        except ValueError:
+            logging.warning("SD_PROFILE_SAMPLE_RATE 格式无效，使用默认采样率 0.05")
+            sample_rate = 0.05
+        return cls(sample_rate=sample_rate, output_dir=os.getenv('SD_PROFILE_DIR', 'profiles'))
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def _should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def _output_prefix(self, name: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._counter += 1
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        return os.path.join(self.output_dir, f"{name}-{timestamp}-{os.getpid()}-{self._counter}")
+
+    def _write_allocations(self, path: str, before, after):
+        """写出本次调用期间新增内存最多的代码行"""
+        stats = after.compare_to(before, 'lineno')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# 新增内存最多的 {self.top_allocations} 处代码\n")
+            for stat in stats[:self.top_allocations]:
+                f.write(f"{stat}\n")
+
+    def call(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        """执行调用，命中采样时采集性能数据"""
+        # 嵌套调用（如 get_paper_content 内部的 login）已被外层采集覆盖
+        if getattr(_local, 'active', False) or not self._should_sample():
+            return func(*args, **kwargs)
+        if not _capture_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        _local.active = True
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start()
+            snapshot_before = tracemalloc.take_snapshot()
+            sampler = StackSampler(threading.get_ident(), self.stack_interval)
+            profile = cProfile.Profile()
+            start_time = time.perf_counter()
+            sampler.start()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                sampler.stop()
+                elapsed = time.perf_counter() - start_time
+                snapshot_after = tracemalloc.take_snapshot()
+                try:
+                    prefix = self._output_prefix(name)
+                    pstats.Stats(profile).dump_stats(f"{prefix}.prof")
+                    sampler.write_collapsed(f"{prefix}.collapsed")
+                    self._write_allocations(f"{prefix}.alloc.txt", snapshot_before, snapshot_after)
+                    logging.info(f"性能采样 {name} 耗时 {elapsed:.3f} 秒，结果保存至 {prefix}.*")
+                except OSError as e:
+                    logging.error(f"保存性能采样结果失败: {str(e)}")
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            _local.active = False
+            _capture_lock.release()
+
+
+def profiled(name: Optional[str] = None):
+    """方法装饰器：通过实例的 profiler 属性按采样率采集性能数据"""
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs) -> Any:
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None or not profiler.enabled:
+                return func(self, *args, **kwargs)
+            return profiler.call(label, func, self, *args, **kwargs)
+
+        return wrapper
+    return decorator
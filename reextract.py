@@ -0,0 +1,156 @@
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Dict, Iterator, Optional, Tuple
+from bs4 import BeautifulSoup
+from archive import iter_archive
+from extractors import build_paper, validate_paper_content
+from paper import canonical_article_id
+from paper_index import PaperIndex
+from session_state import classify_session
+
+ARTICLE_PATH_MARKER = '/science/article/'
+
+
+def _capture_time(warc_date: str) -> float:
+    """解析 WARC-Date（UTC），无法解析时返回 0"""
+    try:
+        return datetime.fromisoformat(warc_date.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _local_time(warc_date: str) -> str:
+    """将 WARC-Date（UTC）转换为与 accessed_time 一致的本地时间格式"""
+    timestamp = _capture_time(warc_date)
+    if not timestamp:
+        return warc_date
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+def _article_pages(archive_dir: str, with_body: bool = True) -> Iterator[Tuple[int, Tuple[str, bytes, str]]]:
+    """筛选归档中成功获取的论文页面，返回 (归档顺序, (url, 正文, 日期))"""
+    position = 0
+    for record in iter_archive(archive_dir, with_body):
+        if record.status != 200 or ARTICLE_PATH_MARKER not in record.url:
+            continue
+        content_type = next((v for k, v in record.headers.items() if k.lower() == 'content-type'), '')
+        if content_type and 'html' not in content_type.lower():
+            continue
+        yield position, (record.url, record.body, record.date)
+        position += 1
+
+
+def _select_latest(archive_dir: str, before: Optional[Dict[str, Tuple[float, int]]] = None):
+    """只读取归档头部，为每篇论文选出最新的一次抓取
+
+    WARC-Date 只精确到秒，时间相同时以归档中靠后的为准。before 不为空时只考虑其中的论文，
+    并且只选择早于给定抓取的版本（用于最新版本提取失败后回退）。
+    返回 ({文章ID: (抓取时间, 归档顺序)}, 论文页面总数)。
+    """
+    latest = {}
+    total = 0
+    for position, (url, _, date) in _article_pages(archive_dir, with_body=False):
+        total += 1
+        article_id = canonical_article_id(url)
+        capture = (_capture_time(date), position)
+        if before is not None and not (article_id in before and capture < before[article_id]):
+            continue
+        if article_id not in latest or capture > latest[article_id]:
+            latest[article_id] = capture
+    return latest, total
+
+
+def _extract_page(item: Tuple[int, Tuple[str, bytes, str]]):
+    """工作进程：从一条归档页面中提取论文，返回 (归档顺序, url, 日期, 论文字典, 失败原因)"""
+    position, (url, body, date) = item
+    try:
+        soup = BeautifulSoup(body, 'html.parser')
+        try:
+            decision = classify_session(soup)
+            if decision.needs_login:
+                return position, url, date, None, f"需要登录: {decision.reason}"
+            paper = build_paper(soup, url, accessed_time=_local_time(date))
+        finally:
+            soup.decompose()
+    except Exception as e:
+        return position, url, date, None, f"解析失败: {str(e)}"
+    if not validate_paper_content(paper):
+        return position, url, date, None, "提取的论文内容不完整或无效"
+    return position, url, date, paper.to_dict(), None
+
+
+def reextract_archive(archive_dir: str, output_path: Optional[str] = None,
+                      index_path: Optional[str] = None, workers: Optional[int] = None,
+                      chunksize: int = 16, index_batch_size: int = 500) -> Dict[str, int]:
+    """使用进程池将归档中的论文页面重新提取为论文记录
+
+    同一论文存在多个归档版本时，只保留抓取时间最新的一份：先只读取归档头部选出每篇论文的
+    最新版本，再只提取这些页面，边提取边写出 JSONL 和索引。最新版本提取失败（例如会话失效时
+    抓取的页面）时回退到更早的版本。内存中只保存每篇论文的 (抓取时间, 归档顺序)。
+    """
+    stats = {'pages': 0, 'papers': 0, 'failed': 0, 'superseded': 0}
+    pending = []
+    output = open(output_path, 'w', encoding='utf-8') if output_path else None
+    index = PaperIndex(index_path) if index_path else None
+    started = time.time()
+
+    try:
+        with Pool(processes=workers) as pool:
+            latest, total = _select_latest(archive_dir)
+            while latest:
+                positions = {position for _, position in latest.values()}
+                selected = (item for item in _article_pages(archive_dir) if item[0] in positions)
+                failed = {}
+                for position, url, date, paper, error in pool.imap_unordered(
+                        _extract_page, selected, chunksize=chunksize):
+                    stats['pages'] += 1
+                    if error:
+                        stats['failed'] += 1
+                        logging.warning(f"重新提取失败 {url}: {error}")
+                        failed[canonical_article_id(url)] = (_capture_time(date), position)
+                        continue
+
+                    stats['papers'] += 1
+                    if output:
+                        output.write(json.dumps(paper, ensure_ascii=False) + '\n')
+                    if index:
+                        pending.append(paper)
+                        if len(pending) >= index_batch_size:
+                            index.add_papers(pending)
+                            pending = []
+                latest = _select_latest(archive_dir, before=failed)[0] if failed else {}
+        if index and pending:
+            index.add_papers(pending)
+    finally:
+        if output:
+            output.close()
+        if index:
+            index.close()
+
+    # 未提取的页面都是已有更新版本成功提取的旧版本
+    stats['superseded'] = total - stats['pages']
+    elapsed = time.time() - started
+    logging.info(f"重新提取完成：{stats['pages']} 个页面，{stats['papers']} 篇论文，"
+                 f"{stats['superseded']} 个旧版本，{stats['failed']} 个失败，耗时 {elapsed:.1f} 秒")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从原始响应归档中离线重新提取论文")
+    parser.add_argument('archive_dir', help="归档目录（SD_ARCHIVE_DIR）")
+    parser.add_argument('--output', help="输出 JSONL 文件")
+    parser.add_argument('--index', help="写入的 SQLite 全文索引文件")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--chunksize', type=int, default=16, help="每次分发给工作进程的页面数")
+    args = parser.parse_args()
+
+    if not args.output and not args.index:
+        parser.error("至少需要指定 --output 或 --index")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    result = reextract_archive(args.archive_dir, args.output, args.index, args.workers, args.chunksize)
+    print(json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,296 @@
+import os
+import re
+import json
+import zlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Union
+import numpy as np
+from paper import canonical_article_id
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?。！？;；])\s+')
+
+
+def _count_tokens(text: str) -> int:
+    """粗略统计词元数量"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    """将超长句子强制切分，在每第 max_tokens 个词元的结尾处断开
+
+    按词元位置而不是空白切分，逗号分隔的公式、参考文献列表等也能保证长度上限。
+    """
+    ends = [match.end() for match in _TOKEN_PATTERN.finditer(sentence)]
+    pieces = []
+    start = 0
+    for i in range(max_tokens - 1, len(ends), max_tokens):
+        pieces.append(sentence[start:ends[i]].strip())
+        start = ends[i]
+    tail = sentence[start:].strip()
+    if tail:
+        # 末尾只剩标点时并入上一段
+        if pieces and _count_tokens(tail) == 0:
+            pieces[-1] += tail
+        else:
+            pieces.append(tail)
+    return pieces
+
+
+def _chunk_text(text: str, max_tokens: int) -> List[str]:
+    """在句子边界上将文本切分为不超过 max_tokens 的片段"""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in _SENTENCE_PATTERN.split(text.strip()):
+        sentence_tokens = _count_tokens(sentence)
+        if sentence_tokens == 0:
+            continue
+        if sentence_tokens > max_tokens:
+            pieces = _split_long_sentence(sentence, max_tokens)
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            piece_tokens = _count_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(' '.join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def chunk_paper(paper: Dict, max_tokens: int = 256) -> List[Dict]:
+    """将论文切分为不跨越章节边界的段落
+
+    摘要单独作为一个章节；没有章节信息的旧记录退化为使用 full_text。
+    """
+    sections = [{'title': 'Abstract', 'text': paper.get('abstract', '')}]
+    sections.extend(paper.get('sections') or [{'title': '', 'text': paper.get('full_text', '')}])
+
+    passages = []
+    for section in sections:
+        for text in _chunk_text(section.get('text', ''), max_tokens):
+            passages.append({
+                'url': paper.get('url', ''),
+                'title': paper.get('title', ''),
+                'section': section.get('title', ''),
+                'text': text,
+            })
+    return passages
+
+
+class HashingFeaturizer:
+    """基于特征哈希的本地词频向量化器（仅依赖CPU，无需训练）"""
+
+    def __init__(self, n_features: int = 1024):
+        self.n_features = n_features
+        self._bucket = lru_cache(maxsize=200000)(self._bucket_uncached)
+
+    def _bucket_uncached(self, token: str):
+        """计算词元对应的哈希桶和符号（使用稳定哈希，跨进程一致）"""
+        h = zlib.crc32(token.encode('utf-8'))
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        return h % self.n_features, sign
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """将文本批量转换为次线性词频向量"""
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                index, sign = self._bucket(token)
+                matrix[row, index] += sign * (1.0 + np.log(count))
+        return matrix
+
+
+class PassageStore:
+    """段落向量库：向量保存在内存映射的 NumPy 矩阵中，查询时按 TF-IDF 余弦相似度排序
+
+    目录结构：
+        vectors.f32     段落词频向量（行优先 float32 矩阵，只追加）
+        passages.jsonl  段落元数据，与向量按行对应
+        meta.json       特征维度、文档频率等统计信息
+    """
+
+    def __init__(self, directory: str = 'passage_store', n_features: int = 1024,
+                 max_tokens: int = 256, block_rows: int = 65536):
+        self.directory = directory
+        self.max_tokens = max_tokens
+        self.block_rows = block_rows
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, 'vectors.f32')
+        self.passages_path = os.path.join(directory, 'passages.jsonl')
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self._load(n_features)
+        self.featurizer = HashingFeaturizer(self.n_features)
+
+    def _load(self, n_features: int):
+        """加载已有的向量库或初始化新库"""
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.n_features = meta['n_features']
+            self.doc_freq = np.asarray(meta['doc_freq'], dtype=np.float64)
+            self.deleted = set(meta['deleted'])
+        else:
+            self.n_features = n_features
+            self.doc_freq = np.zeros(n_features, dtype=np.float64)
+            self.deleted = set()
+
+        self.passages = []
+        self.rows_by_article = {}
+        if os.path.exists(self.passages_path):
+            with open(self.passages_path, 'r', encoding='utf-8') as f:
+                for row, line in enumerate(f):
+                    passage = json.loads(line)
+                    self.passages.append(passage)
+                    if row not in self.deleted:
+                        article_id = canonical_article_id(passage['url'])
+                        self.rows_by_article.setdefault(article_id, []).append(row)
+        self._open_vectors()
+
+    def _open_vectors(self):
+        """以只读方式重新映射向量文件"""
+        rows = len(self.passages)
+        if rows:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                     shape=(rows, self.n_features))
+        else:
+            self.vectors = np.zeros((0, self.n_features), dtype=np.float32)
+        self._norms = None
+
+    def _save_meta(self):
+        """保存统计信息"""
+        meta = {
+            'n_features': self.n_features,
+            'doc_freq': self.doc_freq.tolist(),
+            'deleted': sorted(self.deleted),
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _delete_rows(self, rows: List[int]):
+        """标记删除段落并扣除其文档频率"""
+        for row in rows:
+            self.doc_freq -= self.vectors[row] != 0
+            self.deleted.add(row)
+
+    def add_papers(self, papers: Iterable[Dict]) -> int:
+        """批量加入论文段落；重复加入的论文会替换旧段落，返回新增段落数"""
+        # 同一批次内重复的论文只保留最后一次
+        unique = {}
+        for paper in papers:
+            unique[canonical_article_id(paper.get('url', ''))] = paper
+
+        new_passages = []
+        with self._lock:
+            for article_id, paper in unique.items():
+                old_rows = self.rows_by_article.pop(article_id, [])
+                self._delete_rows(old_rows)
+                passages = chunk_paper(paper, self.max_tokens)
+                start = len(self.passages) + len(new_passages)
+                self.rows_by_article[article_id] = list(range(start, start + len(passages)))
+                new_passages.extend(passages)
+
+            if new_passages:
+                matrix = self.featurizer.transform(
+                    f"{p['title']} {p['section']} {p['text']}" for p in new_passages
+                )
+                self.doc_freq += (matrix != 0).sum(axis=0)
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(matrix.tobytes())
+                with open(self.passages_path, 'a', encoding='utf-8') as f:
+                    for passage in new_passages:
+                        f.write(json.dumps(passage, ensure_ascii=False) + '\n')
+                self.passages.extend(new_passages)
+            self._save_meta()
+            self._open_vectors()
+
+        logging.info(f"段落向量库新增 {len(new_passages)} 个段落")
+        return len(new_passages)
+
+    def add_paper(self, paper: Dict) -> int:
+        """加入单篇论文"""
+        return self.add_papers([paper])
+
+    def _idf_squared(self) -> np.ndarray:
+        """计算平滑 IDF 的平方（查询与文档两侧各乘一次 IDF）"""
+        n_docs = len(self.passages) - len(self.deleted)
+        idf = np.log((1.0 + n_docs) / (1.0 + self.doc_freq)) + 1.0
+        return (idf * idf).astype(np.float32)
+
+    def _row_norms(self, idf_sq: np.ndarray) -> np.ndarray:
+        """分块计算所有段落在 TF-IDF 空间中的范数（结果缓存到下次写入）"""
+        if self._norms is None:
+            norms = np.empty(len(self.passages), dtype=np.float32)
+            for start in range(0, len(self.passages), self.block_rows):
+                block = np.asarray(self.vectors[start:start + self.block_rows])
+                norms[start:start + len(block)] = np.sqrt((block * block) @ idf_sq)
+            if self.deleted:
+                norms[list(self.deleted)] = 0.0
+            self._norms = norms
+        return self._norms
+
+    def search(self, queries: Union[str, List[str]], k: int = 5) -> Union[List[Dict], List[List[Dict]]]:
+        """返回与查询最相似的 top-k 段落
+
+        传入字符串列表时批量查询，返回与之对应的结果列表。
+        """
+        single = isinstance(queries, str)
+        query_list = [queries] if single else list(queries)
+
+        with self._lock:
+            if not self.passages or not query_list:
+                return [] if single else [[] for _ in query_list]
+
+            idf_sq = self._idf_squared()
+            norms = self._row_norms(idf_sq)
+            query_matrix = self.featurizer.transform(query_list) * idf_sq
+            query_norms = np.sqrt((query_matrix * query_matrix) @ (1.0 / idf_sq))
+            query_matrix /= np.maximum(query_norms, 1e-12)[:, None]
+
+            best_scores = np.full((len(query_list), 0), -np.inf, dtype=np.float32)
+            best_rows = np.zeros((len(query_list), 0), dtype=np.int64)
+            for start in range(0, len(self.passages), self.block_rows):
+                block = np.asarray(self.vectors[start:start + self.block_rows])
+                block_norms = norms[start:start + len(block)]
+                scores = (query_matrix @ block.T) / np.maximum(block_norms, 1e-12)
+                scores[:, block_norms == 0] = -np.inf
+                scores = np.concatenate([best_scores, scores], axis=1)
+                rows = np.concatenate(
+                    [best_rows, np.broadcast_to(np.arange(start, start + len(block)),
+                                                (len(query_list), len(block)))], axis=1)
+                top = min(k, scores.shape[1])
+                keep = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+                best_scores = np.take_along_axis(scores, keep, axis=1)
+                best_rows = np.take_along_axis(rows, keep, axis=1)
+
+            results = []
+            for scores, rows in zip(best_scores, best_rows):
+                order = np.argsort(-scores)
+                hits = []
+                for i in order:
+                    if not np.isfinite(scores[i]) or scores[i] <= 0:
+                        continue
+                    hit = dict(self.passages[rows[i]])
+                    hit['score'] = float(scores[i])
+                    hits.append(hit)
+                results.append(hits)
+
+        return results[0] if single else results
+
+    def count(self) -> int:
+        """返回有效段落数量"""
+        return len(self.passages) - len(self.deleted)
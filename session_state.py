@@ -0,0 +1,124 @@
+import logging
+from typing import NamedTuple, Optional
+from urllib.parse import urlparse
+
+# 重定向到这些登录相关地址说明会话已失效
+LOGIN_HOSTS = ('sso.sciencedirect.com', 'jaccount.sjtu.edu.cn', 'id.elsevier.com')
+LOGIN_PATH_MARKERS = ('/user/login', '/user/institution/login', '/authenticate')
+
+# 明确表示需要登录的短语；不包含页头导航中常见的单独 "Sign in"
+LOGIN_PHRASES = (
+    'please sign in',
+    'please log in',
+    'access denied',
+    '请登录',
+    '访问受限',
+)
+
+# 已登录/有访问权限的结构化标志
+FULL_TEXT_SELECTOR = 'div#body'
+PROFILE_SELECTOR = "button[data-testid='user-profile-button']"
+
+# 论文页标题；无全文、无用户头像按钮且出现获取访问权限入口时，说明会话已失效只能看到摘要。
+# 已登录用户访问仅摘要页面（/abs/ 地址、社论等）时没有这些入口，不会被判定为需要登录
+ARTICLE_TITLE_SELECTOR = 'span.title-text'
+# 未登录时论文页上的购买/获取访问权限入口
+ENTITLEMENT_SELECTORS = (
+    "a[href*='/getaccess/']",
+    '.PurchaseOptions',
+    '.access-options',
+    "[data-aa-name*='purchase']",
+    "[data-aa-name*='get-access']",
+)
+
+# 正文容器中至少要有这么多文字才认为全文可见
+MIN_FULL_TEXT_LENGTH = 200
+# 文本扫描的最大字符数
+DEFAULT_SCAN_LIMIT = 4000
+
+
+class SessionDecision(NamedTuple):
+    """会话状态判定结果"""
+    needs_login: bool
+    reason: str
+
+
+def _is_login_url(url: str) -> bool:
+    """判断URL是否为登录页面"""
+    try:
+        parsed = urlparse(url or '')
+    except ValueError:
+        return False
+    if parsed.netloc in LOGIN_HOSTS:
+        return True
+    return any(marker in parsed.path for marker in LOGIN_PATH_MARKERS)
+
+
+def _bounded_text(soup, limit: int) -> str:
+    """按文档顺序读取最多 limit 个字符的可见文本，避免对整页调用 get_text()"""
+    parts = []
+    size = 0
+    root = soup.body or soup
+    for text in root.stripped_strings:
+        parts.append(text)
+        size += len(text) + 1
+        if size >= limit:
+            break
+    return ' '.join(parts)[:limit].lower()
+
+
+def classify_session(soup=None, response=None, scan_limit: int = DEFAULT_SCAN_LIMIT) -> SessionDecision:
+    """根据状态码、重定向地址和页面结构判断会话是否需要重新登录
+
+    判断顺序：
+        1. 状态码 401/403
+        2. 请求被重定向到登录页面
+        3. 正文容器存在且有内容（已获得全文访问权限）
+        4. 页面存在用户头像按钮（已登录）
+        5. 页面包含密码输入框（登录表单）
+        6. 论文页只有标题和摘要（没有全文容器、无用户头像按钮），且带有获取访问权限入口
+        7. 在有限长度的页面文本中出现明确的登录提示
+    """
+    if response is not None:
+        status = getattr(response, 'status_code', None)
+        if status in (401, 403):
+            return SessionDecision(True, f"状态码 {status}")
+        for hop in list(getattr(response, 'history', None) or []) + [response]:
+            hop_url = getattr(hop, 'url', '')
+            if isinstance(hop_url, str) and _is_login_url(hop_url):
+                return SessionDecision(True, f"重定向到登录页面 {hop_url}")
+
+    if soup is None:
+        return SessionDecision(False, "无页面内容，未发现需要登录的信号")
+
+    body = soup.select_one(FULL_TEXT_SELECTOR)
+    if body is not None:
+        length = 0
+        for text in body.stripped_strings:
+            length += len(text)
+            if length >= MIN_FULL_TEXT_LENGTH:
+                return SessionDecision(False, "页面包含全文容器")
+
+    if soup.select_one(PROFILE_SELECTOR) is not None:
+        return SessionDecision(False, "页面包含用户头像按钮")
+
+    if soup.select_one("input[type='password']") is not None:
+        return SessionDecision(True, "页面包含密码输入框")
+
+    if body is None and soup.select_one(ARTICLE_TITLE_SELECTOR) is not None:
+        for selector in ENTITLEMENT_SELECTORS:
+            if soup.select_one(selector) is not None:
+                return SessionDecision(True, f"论文页无全文，包含访问权限入口 {selector}")
+
+    text = _bounded_text(soup, scan_limit)
+    for phrase in LOGIN_PHRASES:
+        if phrase in text:
+            return SessionDecision(True, f"页面提示 '{phrase}'")
+
+    return SessionDecision(False, "未发现需要登录的信号")
+
+
+def log_decision(decision: SessionDecision, url: Optional[str] = None):
+    """记录判定结果"""
+    target = f" ({url})" if url else ''
+    logging.info(f"会话状态判定{target}: 需要登录={decision.needs_login}，原因: {decision.reason}")
@@ -0,0 +1,146 @@
+import os
+import gzip
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import archive
+from archive import ResponseArchive, iter_archive, list_segments
+from paper_index import PaperIndex
+from reextract import reextract_archive, _capture_time
+
+ARTICLE_HTML = '''
+<html><body>
+    <span class="title-text">Archived Paper</span>
+    <a class="author">John Doe</a>
+    <div class="abstract">Archived abstract</div>
+    <div id="body"><section><h2>Introduction</h2><p>Archived body text.</p></section></div>
+</body></html>
+'''
+
+def make_response(url, body, status=200, content_type='text/html; charset=utf-8'):
+    response = MagicMock()
+    response.url = url
+    response.status_code = status
+    response.reason = 'OK' if status == 200 else 'Forbidden'
+    response.headers = {'Content-Type': content_type, 'Content-Encoding': 'gzip'}
+    response.content = body.encode('utf-8')
+    return response
+
+class TestResponseArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_dir = os.path.join(self.tmpdir.name, 'archive')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _roundtrip(self, codec):
+        store = ResponseArchive(self.archive_dir, codec=codec, max_segment_bytes=600)
+        for i in range(3):
+            store.append(make_response(f'https://www.sciencedirect.com/science/article/pii/S{i}', ARTICLE_HTML))
+        store.append(make_response('https://www.sciencedirect.com/science/article/pii/S9', 'denied', status=403))
+
+        records = list(iter_archive(self.archive_dir))
+        self.assertEqual(len(records), 4)
+        self.assertGreater(len(list_segments(self.archive_dir)), 1)
+        self.assertEqual(records[0].url, 'https://www.sciencedirect.com/science/article/pii/S0')
+        self.assertEqual(records[0].status, 200)
+        self.assertEqual(records[0].body, ARTICLE_HTML.encode('utf-8'))
+        self.assertEqual(records[0].headers['Content-Type'], 'text/html; charset=utf-8')
+        self.assertNotIn('Content-Encoding', records[0].headers)
+        self.assertEqual(records[3].status, 403)
+
+    def test_gzip_roundtrip(self):
+        """测试 gzip 分段的写入与读取"""
+        self._roundtrip('gzip')
+
+    @unittest.skipIf(archive.zstandard is None, "未安装 zstandard")
+    def test_zstd_roundtrip(self):
+        """测试 zstd 分段的写入与读取"""
+        self._roundtrip('zstd')
+
+    def test_sensitive_headers_dropped(self):
+        """测试会话凭据相关的头部不会写入归档"""
+        response = make_response('https://www.sciencedirect.com/science/article/pii/S1', ARTICLE_HTML)
+        response.headers.update({'Set-Cookie': 'SD_SESSION=secret; Path=/', 'Authorization': 'Bearer secret'})
+        ResponseArchive(self.archive_dir, codec='gzip').append(response)
+
+        records = list(iter_archive(self.archive_dir))
+        self.assertNotIn('Set-Cookie', records[0].headers)
+        self.assertNotIn('Authorization', records[0].headers)
+        self.assertEqual(records[0].headers['Content-Type'], 'text/html; charset=utf-8')
+        for path in list_segments(self.archive_dir):
+            with gzip.open(path, 'rb') as f:
+                self.assertNotIn(b'secret', f.read())
+
+    def test_reextract(self):
+        """测试离线重新提取"""
+        store = ResponseArchive(self.archive_dir, codec='gzip')
+        store.append(make_response('https://www.sciencedirect.com/science/article/pii/S1', ARTICLE_HTML))
+        store.append(make_response('https://www.sciencedirect.com/science/article/pii/S2',
+                                   '<html><body>Please sign in</body></html>'))
+        store.append(make_response('https://www.sciencedirect.com/science/article/pii/S3', 'denied', status=403))
+        store.append(make_response('https://www.sciencedirect.com/', ARTICLE_HTML))
+
+        output = os.path.join(self.tmpdir.name, 'papers.jsonl')
+        index_path = os.path.join(self.tmpdir.name, 'index.db')
+        stats = reextract_archive(self.archive_dir, output, index_path, workers=2)
+        self.assertEqual(stats['pages'], 2)
+        self.assertEqual(stats['papers'], 1)
+        self.assertEqual(stats['failed'], 1)
+
+        with open(output, encoding='utf-8') as f:
+            papers = [json.loads(line) for line in f]
+        self.assertEqual(papers[0]['title'], 'Archived Paper')
+        self.assertEqual(papers[0]['sections'], [{'title': 'Introduction', 'text': 'Archived body text.'}])
+
+    def test_reextract_keeps_latest_capture(self):
+        """测试同一论文的多个归档版本只保留最新的一份"""
+        store = ResponseArchive(self.archive_dir, codec='gzip')
+        url = 'https://www.sciencedirect.com/science/article/pii/S1'
+        store.append(make_response(url, ARTICLE_HTML.replace('Archived Paper', 'Old Title')))
+        store.append(make_response(url + '?via=ihub', ARTICLE_HTML.replace('Archived Paper', 'New Title')))
+
+        output = os.path.join(self.tmpdir.name, 'papers.jsonl')
+        index_path = os.path.join(self.tmpdir.name, 'index.db')
+        # WARC-Date 只精确到秒，同一秒内的两个版本按归档顺序保留后者
+        stats = reextract_archive(self.archive_dir, output, index_path, workers=2, chunksize=1)
+        self.assertEqual(stats['papers'], 1)
+        self.assertEqual(stats['superseded'], 1)
+
+        with open(output, encoding='utf-8') as f:
+            papers = [json.loads(line) for line in f]
+        self.assertEqual([p['title'] for p in papers], ['New Title'])
+
+        index = PaperIndex(index_path)
+        try:
+            self.assertEqual(index.count(), 1)
+            self.assertEqual(index.search('Title')[0]['title'], 'New Title')
+        finally:
+            index.close()
+
+    def test_reextract_falls_back_to_older_capture(self):
+        """测试最新版本提取失败时回退到更早的版本"""
+        store = ResponseArchive(self.archive_dir, codec='gzip')
+        url = 'https://www.sciencedirect.com/science/article/pii/S1'
+        store.append(make_response(url, ARTICLE_HTML))
+        store.append(make_response(url, '<html><body>Please sign in</body></html>'))
+
+        # 第一遍只读取头部
+        self.assertTrue(all(record.body == b'' for record in iter_archive(self.archive_dir, with_body=False)))
+
+        output = os.path.join(self.tmpdir.name, 'papers.jsonl')
+        stats = reextract_archive(self.archive_dir, output, workers=2)
+        self.assertEqual(stats, {'pages': 2, 'papers': 1, 'failed': 1, 'superseded': 0})
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['title'] for line in f], ['Archived Paper'])
+
+    def test_capture_time(self):
+        """测试 WARC-Date 解析"""
+        self.assertLess(_capture_time('2024-02-07T10:00:00Z'), _capture_time('2024-02-07T10:00:01Z'))
+        self.assertLess(_capture_time('2024-02-07T10:00:00Z'), _capture_time('2024-02-07T10:00:00.5Z'))
+        self.assertEqual(_capture_time('invalid'), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from daemon import AccessorDaemon, AccessorClient, PaperCache
+from paper import Paper
+
+class TestAccessorDaemon(unittest.TestCase):
+    def setUp(self):
+        self.accessor = MagicMock()
+        self.accessor.session_start_time = time.time()
+        self.accessor.get_paper_record.side_effect = lambda url: Paper(title='Test Paper', url=url)
+        self.daemon = AccessorDaemon(self.accessor, port=0)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.daemon.address
+        self.client = AccessorClient(host, port, timeout=5)
+        self.url = 'https://www.sciencedirect.com/science/article/pii/S0927776522004507'
+
+    def tearDown(self):
+        self.client.close()
+        self.daemon.shutdown()
+
+    def test_get_paper_content(self):
+        """测试通过客户端获取论文并命中缓存"""
+        paper = self.client.get_paper_content(self.url)
+        self.assertEqual(paper['title'], 'Test Paper')
+        self.assertEqual(paper['url'], self.url)
+        self.assertIsInstance(self.daemon.cache.get(self.url), Paper)
+        self.client.get_paper_content(self.url.replace('/pii/', '/abs/pii/'))
+        self.assertEqual(self.accessor.get_paper_record.call_count, 1)
+
+        # refresh 跳过缓存
+        self.client.get_paper_content(self.url, refresh=True)
+        self.assertEqual(self.accessor.get_paper_record.call_count, 2)
+
+    def test_errors(self):
+        """测试错误透传"""
+        self.accessor.get_paper_record.side_effect = ValueError("无效的ScienceDirect URL")
+        with self.assertRaisesRegex(ValueError, "无效"):
+            self.client.get_paper_content('https://example.com/paper')
+
+        self.accessor.get_paper_record.side_effect = Exception("登录失败")
+        with self.assertRaisesRegex(Exception, "登录失败"):
+            self.client.get_paper_content(self.url)
+
+    def test_health(self):
+        """测试状态查询"""
+        self.assertEqual(self.client.health()['status'], 'ok')
+
+class TestPaperCache(unittest.TestCase):
+    def test_eviction_and_ttl(self):
+        """测试容量淘汰与过期"""
+        cache = PaperCache(max_size=1, ttl=60)
+        cache.put('https://www.sciencedirect.com/science/article/pii/S1', {'title': 'a'})
+        cache.put('https://www.sciencedirect.com/science/article/pii/S2', {'title': 'b'})
+        self.assertIsNone(cache.get('https://www.sciencedirect.com/science/article/pii/S1'))
+        self.assertEqual(cache.get('https://www.sciencedirect.com/science/article/pii/S2'), {'title': 'b'})
+
+        cache.ttl = -1
+        self.assertIsNone(cache.get('https://www.sciencedirect.com/science/article/pii/S2'))
+
+if __name__ == '__main__':
+    unittest.main()
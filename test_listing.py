@@ -0,0 +1,74 @@
+import unittest
+from bs4 import BeautifulSoup
+from listing import extract_listing, find_next_page, merge_paper, missing_fields
+
+SEARCH_PAGE = '''
+<html><body><ol class="search-result-wrapper">
+    <li class="ResultItem" data-doi="10.1016/j.colsurfb.2022.112345">
+        <h2><a class="result-list-title-link" href="/science/article/pii/S0927776522004507">Graphene <em>electrodes</em></a></h2>
+        <ol class="Authors"><li><span class="author">John Doe</span></li><li><span class="author">Jane Roe</span></li></ol>
+        <div class="preview-abstract">Abstract snippet about graphene.</div>
+    </li>
+    <li class="ResultItem" data-doi="10.1016/j.colsurfb.2022.112346">
+        <h2><a class="result-list-title-link" href="/science/article/abs/pii/S0927776522004519">Protein folding</a></h2>
+        <ol class="Authors"><li><span class="author">Alice Zhang</span></li></ol>
+    </li>
+</ol>
+<ul class="pagination"><li class="pagination-link next-link"><a href="/search?qs=graphene&amp;offset=25">next</a></li></ul>
+</body></html>
+'''
+
+ISSUE_PAGE = '''
+<html><body><ol class="js-article-list">
+    <li class="js-article-list-item article-item">
+        <h3><a class="anchor article-content-title" href="https://www.sciencedirect.com/science/article/pii/S0927776522004600">Issue article</a></h3>
+        <div class="js-article__item__authors">Bob Li, Carol Wang</div>
+        <a href="https://doi.org/10.1016/j.colsurfb.2022.112400">doi</a>
+    </li>
+</ol></body></html>
+'''
+
+class TestListing(unittest.TestCase):
+    def test_search_results(self):
+        """测试搜索结果页提取"""
+        soup = BeautifulSoup(SEARCH_PAGE, 'html.parser')
+        papers = extract_listing(soup)
+        self.assertEqual(len(papers), 2)
+        self.assertEqual(papers[0]['title'], 'Graphene electrodes')
+        self.assertEqual(papers[0]['authors'], ['John Doe', 'Jane Roe'])
+        self.assertEqual(papers[0]['doi'], '10.1016/j.colsurfb.2022.112345')
+        self.assertEqual(papers[0]['abstract_snippet'], 'Abstract snippet about graphene.')
+        self.assertEqual(papers[0]['url'], 'https://www.sciencedirect.com/science/article/pii/S0927776522004507')
+        self.assertEqual(papers[1]['url'], 'https://www.sciencedirect.com/science/article/pii/S0927776522004519')
+        # 摘要片段不算完整摘要
+        self.assertEqual(missing_fields(papers[0], ['title', 'authors', 'abstract']), ['abstract'])
+        self.assertEqual(missing_fields(papers[1], ['title', 'authors', 'abstract']), ['abstract'])
+
+        next_url = find_next_page(soup, 'https://www.sciencedirect.com/search?qs=graphene')
+        self.assertEqual(next_url, 'https://www.sciencedirect.com/search?qs=graphene&offset=25')
+
+    def test_issue_page(self):
+        """测试期刊目录页提取"""
+        soup = BeautifulSoup(ISSUE_PAGE, 'html.parser')
+        papers = extract_listing(soup)
+        self.assertEqual(len(papers), 1)
+        self.assertEqual(papers[0]['authors'], ['Bob Li', 'Carol Wang'])
+        self.assertEqual(papers[0]['doi'], '10.1016/j.colsurfb.2022.112400')
+        self.assertIsNone(find_next_page(soup, 'https://www.sciencedirect.com/journal/x/vol/1'))
+
+    def test_merge_paper(self):
+        """测试用文章页补全列表页记录"""
+        partials = extract_listing(BeautifulSoup(SEARCH_PAGE, 'html.parser'))
+        full = {'title': 'Protein folding', 'authors': ['Alice Zhang'], 'abstract': 'Full abstract',
+                'doi': '', 'url': partials[1]['url']}
+        merged = merge_paper(partials[1], full)
+        self.assertIsInstance(merged, dict)
+        self.assertEqual(merged['abstract'], 'Full abstract')
+        self.assertEqual(merged['doi'], '10.1016/j.colsurfb.2022.112346')
+
+        # 文章页没有摘要时也不会用摘要片段代替
+        merged = merge_paper(partials[0], dict(full, abstract=''))
+        self.assertEqual(merged['abstract'], '')
+
+if __name__ == '__main__':
+    unittest.main()
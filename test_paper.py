@@ -0,0 +1,72 @@
+import json
+import unittest
+from paper import Paper
+
+class TestPaper(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            'title': 'Test Paper',
+            'authors': ['John Doe', 'Jane Roe'],
+            'abstract': 'Test abstract',
+            'keywords': ['keyword1'],
+            'full_text': 'Introduction ' * 200,
+            'sections': [{'title': 'Introduction', 'text': 'Introduction ' * 199}],
+            'doi': '10.1234/test',
+            'accessed_time': '2024-02-07 10:00:00',
+            'url': 'https://www.sciencedirect.com/science/article/pii/S0927776522004507'
+        }
+
+    def test_dict_compatibility(self):
+        """测试字典方式访问"""
+        paper = Paper.from_dict(self.data)
+        self.assertEqual(paper['title'], 'Test Paper')
+        self.assertEqual(paper['authors'], ['John Doe', 'Jane Roe'])
+        self.assertEqual(paper.get('doi'), '10.1234/test')
+        self.assertIsNone(paper.get('missing'))
+        self.assertIn('accessed_time', paper)
+        self.assertEqual(dict(paper), self.data)
+        self.assertEqual(paper, self.data)
+        json.dumps(paper.to_dict())
+
+        paper['title'] = 'New Title'
+        self.assertEqual(paper.title, 'New Title')
+        with self.assertRaises(KeyError):
+            paper['unknown'] = 'value'
+
+    def test_compressed_full_text(self):
+        """测试正文压缩存储"""
+        paper = Paper.from_dict(self.data, compress=True)
+        self.assertTrue(paper.compressed)
+        self.assertEqual(paper['full_text'], self.data['full_text'])
+        self.assertEqual(paper['sections'], self.data['sections'])
+
+        # 短正文不压缩
+        short = Paper(full_text='short', compress=True)
+        self.assertFalse(short.compressed)
+
+    def test_sections_share_full_text(self):
+        """测试章节以正文偏移保存，正文只保存一份"""
+        paper = Paper.from_dict(self.data)
+        self.assertEqual(len(paper._body[1][0]), 3)
+        self.assertEqual(paper['sections'], self.data['sections'])
+
+        # 不在正文中的章节单独保存
+        other = Paper(full_text='Body text', sections=[{'title': 'Notes', 'text': 'Elsewhere'}])
+        self.assertEqual(other['sections'], [{'title': 'Notes', 'text': 'Elsewhere'}])
+
+        # 修改正文后章节保持不变
+        paper['full_text'] = 'Replaced'
+        self.assertEqual(paper['sections'], self.data['sections'])
+
+    def test_interned_strings(self):
+        """测试作者与关键词字符串驻留"""
+        a = Paper(authors=[''.join(['John', ' Doe'])])
+        b = Paper(authors=[''.join(['John ', 'Doe'])])
+        self.assertIs(a.authors[0], b.authors[0])
+
+    def test_slots(self):
+        """测试记录不携带实例字典"""
+        self.assertFalse(hasattr(Paper(), '__dict__'))
+
+if __name__ == '__main__':
+    unittest.main()
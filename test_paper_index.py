@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from paper import canonical_article_id
+from paper_index import PaperIndex
+
+class TestPaperIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index = PaperIndex(os.path.join(self.tmpdir.name, 'index.db'))
+        self.paper = {
+            'title': 'Graphene electrodes for lithium batteries',
+            'authors': ['Alice Zhang', 'Bob Li'],
+            'abstract': 'We study graphene based electrodes.',
+            'keywords': ['graphene', 'battery'],
+            'full_text': 'Introduction Lithium storage capacity is measured.',
+            'sections': [{'title': 'Introduction', 'text': 'Lithium storage capacity is measured.'}],
+            'doi': '10.1234/test',
+            'accessed_time': '2024-02-07 10:00:00',
+            'url': 'https://www.sciencedirect.com/science/article/pii/S0927776522004507'
+        }
+
+    def tearDown(self):
+        self.index.close()
+        self.tmpdir.cleanup()
+
+    def test_canonical_article_id(self):
+        """测试文章ID规范化"""
+        self.assertEqual(
+            canonical_article_id('https://www.sciencedirect.com/science/article/abs/pii/S0927776522004507?via=ihub'),
+            'S0927776522004507'
+        )
+        self.assertEqual(canonical_article_id(self.paper['url']), 'S0927776522004507')
+
+    def test_add_and_search(self):
+        """测试添加论文与关键词检索"""
+        self.index.add_paper(self.paper)
+        results = self.index.search('graphene')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], self.paper['title'])
+        self.assertNotIn('full_text', results[0])
+
+        # 正文章节也可检索
+        self.assertEqual(len(self.index.search('storage capacity')), 1)
+        self.assertEqual(self.index.search('nonexistentterm'), [])
+
+    def test_field_search(self):
+        """测试按字段检索"""
+        self.index.add_paper(self.paper)
+        self.assertEqual(len(self.index.search('Zhang', fields=['authors'])), 1)
+        self.assertEqual(self.index.search('Zhang', fields=['title']), [])
+        with self.assertRaises(ValueError):
+            self.index.search('Zhang', fields=['unknown'])
+
+    def test_ranking(self):
+        """测试标题命中排名高于正文命中"""
+        other = dict(self.paper, title='Silicon anodes', keywords=['silicon'],
+                     abstract='Silicon anodes.', sections=[],
+                     full_text='A brief graphene comparison.',
+                     url='https://www.sciencedirect.com/science/article/pii/S1111111111111111')
+        self.index.add_papers([other, self.paper])
+        results = self.index.search('graphene')
+        self.assertEqual(results[0]['title'], self.paper['title'])
+
+    def test_refetch_updates_in_place(self):
+        """测试重复抓取时原地更新"""
+        self.index.add_paper(self.paper)
+        updated = dict(self.paper, title='Graphene electrodes revisited',
+                       url='https://www.sciencedirect.com/science/article/abs/pii/S0927776522004507')
+        self.index.add_paper(updated)
+        self.assertEqual(self.index.count(), 1)
+        self.assertEqual(self.index.search('revisited')[0]['title'], 'Graphene electrodes revisited')
+
+    def test_remove_paper(self):
+        """测试删除论文"""
+        self.index.add_paper(self.paper)
+        self.assertTrue(self.index.remove_paper(self.paper['url']))
+        self.assertEqual(self.index.search('graphene'), [])
+        self.assertFalse(self.index.remove_paper(self.paper['url']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from profiling import Profiler, profiled
+
+class Worker:
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    @profiled()
+    def outer(self):
+        data = [bytearray(1024) for _ in range(100)]
+        time.sleep(0.05)
+        return self.inner(len(data))
+
+    @profiled()
+    def inner(self, n):
+        return n
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_disabled_by_default(self):
+        """测试未开启时不产生输出"""
+        with patch.dict(os.environ, {}, clear=True):
+            profiler = Profiler.from_env()
+        self.assertFalse(profiler.enabled)
+        profiler.output_dir = self.tmpdir.name
+        self.assertEqual(Worker(profiler).outer(), 100)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_from_env(self):
+        """测试通过环境变量开启"""
+        env = {'SD_PROFILE': '1', 'SD_PROFILE_SAMPLE_RATE': '0.5', 'SD_PROFILE_DIR': self.tmpdir.name}
+        with patch.dict(os.environ, env):
+            profiler = Profiler.from_env()
+        self.assertEqual(profiler.sample_rate, 0.5)
+        self.assertEqual(profiler.output_dir, self.tmpdir.name)
+
+    def test_sampled_capture(self):
+        """测试采样输出折叠栈、cProfile 与内存分配报告，嵌套调用只采集一次"""
+        profiler = Profiler(sample_rate=1.0, output_dir=self.tmpdir.name, stack_interval=0.001)
+        self.assertEqual(Worker(profiler).outer(), 100)
+
+        files = sorted(os.listdir(self.tmpdir.name))
+        self.assertEqual(len(files), 3)
+        self.assertTrue(all(f.startswith('outer-') for f in files))
+        collapsed = next(f for f in files if f.endswith('.collapsed'))
+        with open(os.path.join(self.tmpdir.name, collapsed), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+        self.assertTrue(any('outer_(test_profiling.py' in line for line in lines))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from retrieval import PassageStore, chunk_paper, _count_tokens
+
+def make_paper(pii, title, sections):
+    return {
+        'title': title,
+        'abstract': f'Abstract of {title}.',
+        'sections': [{'title': t, 'text': text} for t, text in sections],
+        'full_text': '',
+        'url': f'https://www.sciencedirect.com/science/article/pii/{pii}'
+    }
+
+class TestRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.papers = [
+            make_paper('S1', 'Graphene electrodes', [
+                ('Introduction', 'Graphene is a promising electrode material.'),
+                ('Results', 'Lithium ion capacity reached 700 mAh per gram.'),
+            ]),
+            make_paper('S2', 'Protein folding', [
+                ('Introduction', 'Protein folding is simulated with molecular dynamics.'),
+            ]),
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chunk_respects_sections_and_limit(self):
+        """测试切分不跨越章节且不超过词元上限"""
+        long_text = ' '.join(f'Sentence number {i} is here.' for i in range(50))
+        paper = make_paper('S3', 'Long', [('Intro', long_text), ('Method', 'Short method.')])
+        passages = chunk_paper(paper, max_tokens=20)
+        self.assertEqual(passages[0]['section'], 'Abstract')
+        self.assertEqual(passages[-1], {
+            'url': paper['url'], 'title': 'Long', 'section': 'Method', 'text': 'Short method.'
+        })
+        for passage in passages:
+            self.assertLessEqual(_count_tokens(passage['text']), 20)
+
+        # 没有空白的长串（如逗号分隔的列表）同样按词元数切分
+        run = ','.join(f'x{i}' for i in range(600))
+        passages = chunk_paper(make_paper('S4', 'Run', [('Refs', run)]), max_tokens=50)
+        refs = [p['text'] for p in passages if p['section'] == 'Refs']
+        self.assertEqual(len(refs), 12)
+        self.assertTrue(all(_count_tokens(text) <= 50 for text in refs))
+        self.assertEqual(''.join(refs), run)
+
+    def test_search_ranks_relevant_passage(self):
+        """测试相似度检索"""
+        store = PassageStore(self.tmpdir.name, n_features=256)
+        store.add_papers(self.papers)
+        hits = store.search('lithium capacity', k=2)
+        self.assertEqual(hits[0]['section'], 'Results')
+        self.assertGreater(hits[0]['score'], 0)
+
+        batch = store.search(['protein dynamics', 'graphene electrode'], k=1)
+        self.assertEqual(batch[0][0]['title'], 'Protein folding')
+        self.assertEqual(batch[1][0]['title'], 'Graphene electrodes')
+
+    def test_reopen_and_replace(self):
+        """测试重新打开向量库以及重复加入时替换旧段落"""
+        store = PassageStore(self.tmpdir.name, n_features=256, block_rows=2)
+        store.add_papers(self.papers)
+        count = store.count()
+
+        reopened = PassageStore(self.tmpdir.name)
+        self.assertEqual(reopened.n_features, 256)
+        self.assertEqual(reopened.count(), count)
+
+        updated = make_paper('S2', 'Protein folding', [('Introduction', 'Cryo electron microscopy.')])
+        reopened.add_paper(updated)
+        self.assertEqual(reopened.count(), count)
+        hits = reopened.search('molecular dynamics', k=5)
+        self.assertFalse(any('molecular dynamics' in hit['text'] for hit in hits))
+        self.assertEqual(reopened.search('cryo microscopy', k=1)[0]['title'], 'Protein folding')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,12 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from plugin import ScienceDirectAccessor
+from paper import Paper
+import json
 import time
+import threading
+import os
+import tempfile
 from bs4 import BeautifulSoup
 
 class TestScienceDirectAccessor(unittest.TestCase):
@@ -42,6 +47,72 @@ class TestScienceDirectAccessor(unittest.TestCase):
         # 验证两次请求之间的间隔是否符合要求
         self.assertGreaterEqual(end_time - start_time, self.accessor.min_request_interval)
         
+    def test_concurrent_fetch_coalesced(self):
+        """测试同一论文的并发请求只抓取一次"""
+        def slow_fetch(url):
+            time.sleep(0.2)
+            return {'title': 'Test Paper', 'url': url}
+
+        results = []
+        with patch.object(self.accessor, '_get_paper_content', side_effect=slow_fetch) as mock_fetch:
+            threads = [
+                threading.Thread(target=lambda u=u: results.append(self.accessor.get_paper_content(u)))
+                for u in [
+                    "https://www.sciencedirect.com/science/article/pii/S0927776522004507",
+                    "https://www.sciencedirect.com/science/article/abs/pii/S0927776522004507",
+                    "https://www.sciencedirect.com/science/article/pii/S0927776522004507?via=ihub",
+                ]
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r['title'] == 'Test Paper' for r in results))
+
+    def test_get_paper_content_returns_dict(self):
+        """测试对外返回可修改、可 JSON 序列化的普通字典"""
+        url = "https://www.sciencedirect.com/science/article/pii/S0927776522004507"
+        record = Paper(title='Test Paper', authors=['John Doe'], full_text='Text', url=url)
+        with patch.object(self.accessor, '_get_paper_content', return_value=record):
+            content = self.accessor.get_paper_content(url)
+            self.assertIsInstance(content, dict)
+            self.assertEqual(json.loads(json.dumps(content))['authors'], ['John Doe'])
+            content['note'] = 'extra'
+
+            # 需要紧凑记录时使用 get_paper_record
+            self.assertIsInstance(self.accessor.get_paper_record(url), Paper)
+
+    def test_concurrent_login_coalesced(self):
+        """测试并发登录只启动一次登录流程"""
+        def slow_login():
+            time.sleep(0.2)
+            return True
+
+        with patch.object(self.accessor, '_login', side_effect=slow_login) as mock_login:
+            threads = [threading.Thread(target=self.accessor.login) for _ in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(mock_login.call_count, 1)
+
+    def test_profiling_context(self):
+        """测试通过上下文管理器开启性能采样"""
+        url = "https://www.sciencedirect.com/science/article/pii/S0927776522004507"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(self.accessor, '_get_paper_content', return_value={'url': url}):
+                with self.accessor.profiling(output_dir=tmpdir):
+                    self.accessor.get_paper_content(url)
+                    self.accessor.get_paper_record(url)
+                self.assertFalse(self.accessor.profiler.enabled)
+                self.accessor.get_paper_content(url)
+            files = os.listdir(tmpdir)
+            # 两次抓取各采集一次（.prof、.collapsed、.alloc.txt）
+            self.assertEqual(len(files), 6)
+            self.assertTrue(all(f.startswith('get_paper_content-') for f in files))
+
     def test_session_validity(self):
         """测试会话有效性检查"""
         # 测试新会话
@@ -51,6 +122,38 @@ class TestScienceDirectAccessor(unittest.TestCase):
         self.accessor.session_start_time = time.time() - (self.accessor.max_session_duration + 1)
         self.assertFalse(self.accessor._check_session_validity())
         
+    def test_cookie_validity_cache(self):
+        """测试cookies验证结果缓存"""
+        self.accessor.cookies = [{'name': 'test', 'value': 'test'}]
+        self.accessor.cookies_valid_until = time.time() + 60
+        with patch('requests.Session.get') as mock_get:
+            self.assertTrue(self.accessor._check_cookies_valid())
+            mock_get.assert_not_called()
+
+        # 会话过期后缓存失效
+        self.accessor.session_start_time = time.time() - (self.accessor.max_session_duration + 1)
+        self.accessor._check_session_validity()
+        self.assertEqual(self.accessor.cookies_valid_until, 0)
+
+    def test_cookie_check_ignores_header_sign_in(self):
+        """测试首页页头的 Sign in 链接不会使 cookies 验证失败"""
+        self.accessor.cookies = []
+        with patch.object(self.accessor, '_load_cookies', return_value=True), \
+                patch('requests.Session.get') as mock_get:
+            response = MagicMock()
+            response.text = ('<html><body><a href="/user/login">Sign in</a>'
+                             '<button data-testid="user-profile-button">JD</button></body></html>')
+            response.status_code = 200
+            response.url = 'https://www.sciencedirect.com/'
+            response.history = []
+            mock_get.return_value = response
+            self.assertTrue(self.accessor._check_cookies_valid())
+
+            # 被重定向到登录页面时 cookies 无效
+            self.accessor.cookies_valid_until = 0
+            response.url = 'https://id.elsevier.com/as/authorization.oauth2'
+            self.assertFalse(self.accessor._check_cookies_valid())
+
     def test_needs_relogin(self):
         """测试重新登录检测"""
         # 模拟需要登录的页面
@@ -62,7 +165,31 @@ class TestScienceDirectAccessor(unittest.TestCase):
         html_normal = '<html><body>Welcome to ScienceDirect</body></html>'
         soup_normal = BeautifulSoup(html_normal, 'html.parser')
         self.assertFalse(self.accessor._needs_relogin(soup_normal))
-        
+
+        # 页头包含 Sign in 链接但正文可见的论文页面
+        html_article = (
+            '<html><body><a href="/user/login">Sign in</a>'
+            f'<div id="body">{"Full text content. " * 20}</div></body></html>'
+        )
+        soup_article = BeautifulSoup(html_article, 'html.parser')
+        self.assertFalse(self.accessor._needs_relogin(soup_article))
+        self.assertEqual(self.accessor.last_session_decision.reason, "页面包含全文容器")
+
+    def test_fetch_after_relogin(self):
+        """测试重新登录后页面仍只显示摘要时交由提取和验证处理"""
+        url = "https://www.sciencedirect.com/science/article/abs/pii/S0927776522004507"
+        soup = BeautifulSoup('<span class="title-text">Test Paper</span>', 'html.parser')
+        with patch.object(self.accessor, 'login', return_value=True) as mock_login, \
+                patch.object(self.accessor, '_fetch_page', return_value=(soup, True)):
+            self.assertIs(self.accessor._fetch_authorized_page(url), soup)
+            mock_login.assert_called_once()
+
+        # 重新登录后仍返回 401/403 时报错
+        with patch.object(self.accessor, 'login', return_value=True), \
+                patch.object(self.accessor, '_fetch_page', return_value=(None, True)):
+            with self.assertRaises(Exception):
+                self.accessor._fetch_authorized_page(url)
+
     def test_validate_paper_content(self):
         """测试论文内容验证"""
         # 测试完整的论文信息
@@ -108,6 +235,91 @@ class TestScienceDirectAccessor(unittest.TestCase):
             self.assertIn('User-Agent', mock_get.call_args[1]['headers'])
             self.assertIn('Sec-Fetch-Mode', mock_get.call_args[1]['headers'])
             
+    def test_secure_request_archive(self):
+        """测试请求响应归档"""
+        self.accessor.min_request_interval = 0
+        self.accessor.archive = MagicMock()
+        with patch('requests.Session.get') as mock_get:
+            mock_response = MagicMock()
+            mock_get.return_value = mock_response
+            self.accessor._secure_request('https://www.sciencedirect.com')
+            self.accessor.archive.append.assert_called_once_with(mock_response)
+
+            # 归档失败不影响请求
+            self.accessor.archive.append.side_effect = OSError("磁盘已满")
+            self.assertIs(self.accessor._secure_request('https://www.sciencedirect.com'), mock_response)
+
+    def test_harvest_metadata(self):
+        """测试从列表页批量获取元数据，仅对缺少字段的文章抓取文章页"""
+        page1 = '''
+        <li class="ResultItem" data-doi="10.1/s1"><a class="result-list-title-link" href="/science/article/pii/S1">Paper 1</a>
+            <ol class="Authors"><li><span class="author">John Doe</span></li></ol>
+            <div class="preview-abstract">Abstract 1</div></li>
+        <li class="ResultItem" data-doi="10.1/s2"><a class="result-list-title-link" href="/science/article/pii/S2">Paper 2</a>
+            <ol class="Authors"><li><span class="author">Jane Roe</span></li></ol></li>
+        <li class="next-link"><a href="/search?qs=test&amp;offset=2">next</a></li>
+        '''
+        page2 = '''
+        <li class="ResultItem"><a class="result-list-title-link" href="/science/article/pii/S1">Paper 1</a></li>
+        <li class="ResultItem" data-doi="10.1/s3"><a class="result-list-title-link" href="/science/article/pii/S3">Paper 3</a>
+            <ol class="Authors"><li><span class="author">Bob Li</span></li></ol>
+            <div class="preview-abstract">Abstract 3</div></li>
+        '''
+        pages = {
+            'https://www.sciencedirect.com/search?qs=test': page1,
+            'https://www.sciencedirect.com/search?qs=test&offset=2': page2,
+        }
+        self.accessor.min_request_interval = 0
+
+        def fake_get(url, **kwargs):
+            response = MagicMock()
+            response.text = pages[url]
+            response.status_code = 200
+            response.url = url
+            response.history = []
+            return response
+
+        def fake_fetch(url):
+            article_id = url.rsplit('/', 1)[-1]
+            return {'title': f'Paper {article_id[1:]}', 'abstract': f'Full abstract {article_id[1:]}', 'url': url}
+
+        with patch('requests.Session.get', side_effect=fake_get), \
+                patch.object(self.accessor, 'get_paper_content', side_effect=fake_fetch) as mock_fetch:
+            # 默认只要求列表页提供的字段，不抓取任何文章页
+            papers = list(self.accessor.harvest_metadata('https://www.sciencedirect.com/search?qs=test'))
+            mock_fetch.assert_not_called()
+            self.assertEqual([p['title'] for p in papers], ['Paper 1', 'Paper 2', 'Paper 3'])
+            self.assertEqual([p['doi'] for p in papers], ['10.1/s1', '10.1/s2', '10.1/s3'])
+            self.assertEqual(papers[0]['abstract'], '')
+            self.assertEqual(papers[0]['abstract_snippet'], 'Abstract 1')
+
+            # 显式要求完整摘要时，摘要片段不算数，每篇文章都需要抓取文章页
+            papers = list(self.accessor.harvest_metadata(
+                'https://www.sciencedirect.com/search?qs=test',
+                required_fields=('title', 'authors', 'doi', 'abstract')))
+            self.assertEqual([p['abstract'] for p in papers],
+                             ['Full abstract 1', 'Full abstract 2', 'Full abstract 3'])
+            self.assertEqual(papers[1]['authors'], ['Jane Roe'])
+            self.assertEqual(mock_fetch.call_count, 3)
+
+    def test_extract_sections(self):
+        """测试按章节提取正文"""
+        html = '''
+        <div id="body">
+            <section><h2>1. Introduction</h2><p>Intro text</p>
+                <section><h3>1.1 Background</h3><p>Background text</p></section>
+            </section>
+            <section><h2>2. Methods</h2><p>Methods text</p></section>
+        </div>
+        '''
+        sections = self.accessor._extract_sections(BeautifulSoup(html, 'html.parser'))
+        self.assertEqual([s['title'] for s in sections], ['1. Introduction', '2. Methods'])
+        self.assertIn('Background text', sections[0]['text'])
+
+        # 无章节结构时整体作为一个章节
+        flat = BeautifulSoup('<div id="body">Plain text</div>', 'html.parser')
+        self.assertEqual(self.accessor._extract_sections(flat), [{'title': '', 'text': 'Plain text'}])
+
     def test_paper_content_extraction(self):
         """测试论文内容提取"""
         test_html = '''
@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import MagicMock
+from bs4 import BeautifulSoup
+from session_state import classify_session
+
+# 已登录用户看到的论文页面：页头有 "Sign in" 链接，正文可见
+ARTICLE_PAGE = '''
+<html><body>
+    <header><a href="/user/login">Sign in</a><a href="/user/register">Register</a></header>
+    <span class="title-text">Graphene electrodes</span>
+    <div class="abstract">We study graphene electrodes.</div>
+    <div id="body">
+        <section><h2>1. Introduction</h2><p>%s</p></section>
+    </div>
+</body></html>
+''' % ('Graphene is a promising electrode material. ' * 20)
+
+# 只有摘要、未获得全文权限但已登录的页面
+PROFILE_PAGE = '''
+<html><body>
+    <header><button data-testid="user-profile-button">JD</button></header>
+    <span class="title-text">Graphene electrodes</span>
+    <div class="abstract">We study graphene electrodes.</div>
+</body></html>
+'''
+
+# 会话失效后的论文页面：只显示标题、作者、摘要和获取访问权限入口
+LOGGED_OUT_ABSTRACT_PAGE = '''
+<html><body>
+    <header><a href="/user/login">Sign in</a></header>
+    <span class="title-text">Graphene electrodes</span>
+    <div class="author-group"><a class="author">John Doe</a></div>
+    <div class="abstract">We study graphene electrodes.</div>
+    <div class="PurchaseOptions">
+        <a href="/science/article/pii/S1/getaccess/">Get Access</a>
+        <a data-aa-name="purchase-pdf">Purchase PDF</a>
+    </div>
+</body></html>
+'''
+
+# 会话有效时的仅摘要页面（/abs/ 地址、社论等）：页头有 Sign in 链接，无全文也无访问权限入口
+ABSTRACT_ONLY_PAGE = '''
+<html><body>
+    <header><a href="/user/login">Sign in</a></header>
+    <span class="title-text">Editorial: Graphene electrodes</span>
+    <div class="author-group"><a class="author">John Doe</a></div>
+    <div class="abstract">This editorial introduces the special issue.</div>
+</body></html>
+'''
+
+# 会话失效后的访问受限页面
+ACCESS_DENIED_PAGE = '''
+<html><body>
+    <header><a href="/user/login">Sign in</a></header>
+    <div class="message">Access denied. Please sign in through your institution.</div>
+</body></html>
+'''
+
+# 登录表单页面
+LOGIN_FORM_PAGE = '''
+<html><body>
+    <form action="/login"><input id="user" type="text"><input id="pass" type="password"></form>
+</body></html>
+'''
+
+# 提示出现在扫描范围之外的长页面
+LONG_PAGE = '<html><body><p>%s</p><p>Please sign in</p></body></html>' % ('filler ' * 2000)
+
+
+def make_response(url, status=200, history=None):
+    response = MagicMock()
+    response.url = url
+    response.status_code = status
+    response.history = history or []
+    return response
+
+
+class TestSessionState(unittest.TestCase):
+    def classify(self, html, response=None, **kwargs):
+        return classify_session(BeautifulSoup(html, 'html.parser'), response, **kwargs)
+
+    def test_article_with_header_sign_in_link(self):
+        """测试页头 Sign in 链接不会触发重新登录"""
+        decision = self.classify(ARTICLE_PAGE)
+        self.assertFalse(decision.needs_login)
+        self.assertIn('全文容器', decision.reason)
+
+    def test_profile_button(self):
+        """测试用户头像按钮表示已登录"""
+        decision = self.classify(PROFILE_PAGE)
+        self.assertFalse(decision.needs_login)
+        self.assertIn('头像', decision.reason)
+
+    def test_logged_out_abstract_page(self):
+        """测试会话失效后只显示摘要的论文页面"""
+        decision = self.classify(LOGGED_OUT_ABSTRACT_PAGE)
+        self.assertTrue(decision.needs_login)
+        self.assertIn('getaccess', decision.reason)
+
+    def test_logged_in_abstract_page(self):
+        """测试已登录用户访问仅摘要页面（无全文、无访问权限入口）不触发重新登录"""
+        decision = self.classify(ABSTRACT_ONLY_PAGE)
+        self.assertFalse(decision.needs_login)
+
+    def test_access_denied(self):
+        """测试访问受限提示"""
+        self.assertTrue(self.classify(ACCESS_DENIED_PAGE).needs_login)
+
+    def test_login_form(self):
+        """测试登录表单"""
+        decision = self.classify(LOGIN_FORM_PAGE)
+        self.assertTrue(decision.needs_login)
+        self.assertIn('密码', decision.reason)
+
+    def test_status_code(self):
+        """测试 401/403 状态码"""
+        response = make_response('https://www.sciencedirect.com/science/article/pii/S1', status=403)
+        decision = classify_session(response=response)
+        self.assertTrue(decision.needs_login)
+        self.assertIn('403', decision.reason)
+
+    def test_redirect_to_login(self):
+        """测试重定向到登录页面"""
+        hop = make_response('https://www.sciencedirect.com/science/article/pii/S1', status=302)
+        response = make_response('https://sso.sciencedirect.com/v1/login?returnUrl=x', history=[hop])
+        self.assertTrue(self.classify(ARTICLE_PAGE, response).needs_login)
+
+        ok = make_response('https://www.sciencedirect.com/science/article/pii/S1')
+        self.assertFalse(self.classify(ARTICLE_PAGE, ok).needs_login)
+
+    def test_bounded_scan(self):
+        """测试只扫描有限长度的文本"""
+        self.assertFalse(self.classify(LONG_PAGE).needs_login)
+        self.assertTrue(self.classify(LONG_PAGE, scan_limit=100000).needs_login)
+
+if __name__ == '__main__':
+    unittest.main()
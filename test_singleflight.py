@@ -0,0 +1,53 @@
+import threading
+import time
+import unittest
+from singleflight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def _run_concurrently(self, flight, key, func, n=5):
+        results = []
+        errors = []
+        def worker():
+            try:
+                results.append(flight.do(key, func))
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_calls_coalesce(self):
+        """测试并发相同调用只执行一次"""
+        calls = []
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'paper'
+        results, errors = self._run_concurrently(SingleFlight(), 'S1', slow)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [])
+        self.assertEqual([r[0] for r in results], ['paper'] * 5)
+        self.assertTrue(all(shared for _, shared in results))
+
+    def test_errors_are_shared(self):
+        """测试异常同样共享给等待方"""
+        def failing():
+            time.sleep(0.2)
+            raise ValueError("登录失败")
+        results, errors = self._run_concurrently(SingleFlight(), 'login', failing)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+
+    def test_sequential_calls_run_again(self):
+        """测试调用完成后再次调用会重新执行"""
+        flight = SingleFlight()
+        calls = []
+        self.assertEqual(flight.do('S1', lambda: calls.append(1) or len(calls)), (1, False))
+        self.assertEqual(flight.do('S1', lambda: calls.append(1) or len(calls)), (2, False))
+        self.assertFalse(flight.in_flight('S1'))
+
+if __name__ == '__main__':
+    unittest.main()